@@ -1,9 +1,10 @@
 """This is the main driver module for APA102 LEDs"""
 from math import ceil
 from collections import namedtuple
-import functools
 import itertools
-from types import MethodType
+import threading
+
+import numpy as np
 
 import debug
 
@@ -22,6 +23,10 @@ Pixel.MAGENTA = Pixel(255, 0, 255, 100)
 Pixel.BLACK = Pixel(0, 0, 0, 0)
 Pixel.WHITE = Pixel(255, 255, 255, 100)
 
+# A run of count LEDs (starting at physical index first) that is driven by its
+# own SPI device. Its frames start at offset in the wire buffer.
+Segment = namedtuple('Segment', 'first count offset spi transmitter')
+
 def clamp(val, min_val, max_val):
     """Return the value clamped within the range [min_val, max_val]."""
     if val < min_val:
@@ -31,7 +36,12 @@ def clamp(val, min_val, max_val):
     return val
 
 class APA102Cmd:
-  """Helper class to convert Pixel instance to an APA102 command.
+  """Helper class to convert pixels to APA102 commands.
+
+  All of the arithmetic is done up front: For every brightness percent (0--100)
+  and every color value (0--255) a table holds the resulting wire byte. A
+  whole frame is then converted with a few NumPy table lookups, independent
+  of how many different colors it contains.
   """
   LED_START = 0b11100000 # Three "1" bits, followed by 5 brightness bits
   BRIGHTNESS = 0b00011111
@@ -42,14 +52,6 @@ class APA102Cmd:
       ret = clamp(ceil(pct * APA102Cmd.BRIGHTNESS / 100.0), 0, APA102Cmd.BRIGHTNESS)
       return ret
 
-  def bright_cmd(self, pixel):
-      return Pixel(pixel.red, pixel.green, pixel.blue,
-                   APA102Cmd.bright_percent(round(pixel.brightness * self.max_brightness / 100)))
-
-  def bright_color(self, pixel):
-      scale = pixel.brightness * self.max_brightness / 100 / 100
-      return Pixel(*[round(n*scale) for n in pixel[0:3]], brightness=APA102Cmd.BRIGHTNESS)
-
   def __init__(self, rgb_map, max_brightness, bright_rgb=True):
       """Set some global options for our LED type.
       Params:
@@ -60,25 +62,114 @@ class APA102Cmd:
       """
       self.rgb_map = rgb_map
       self.max_brightness = max_brightness
-      self.bright = MethodType(APA102Cmd.bright_color if bright_rgb else APA102Cmd.bright_cmd, self)
+      percent = np.arange(101)
+      values = np.arange(256)
+      if bright_rgb:
+          # Full hardware brightness, the color values carry the brightness.
+          scale = percent * max_brightness / 100 / 100
+          color_lut = np.clip(np.rint(np.outer(scale, values)), 0, 255)
+          bright_lut = np.full(101, APA102Cmd.BRIGHTNESS)
+      else:
+          # Unchanged color values, the 5 bit brightness field does the work.
+          color_lut = np.tile(values, (101, 1))
+          bright_lut = [APA102Cmd.bright_percent(round(pct * max_brightness / 100))
+                        for pct in percent]
+      # color_lut[brightness, value] is the wire byte for a color value;
+      # bright_lut[brightness] is the LED start byte.
+      self.color_lut = color_lut.astype(np.uint8)
+      self.bright_lut = np.bitwise_or(bright_lut, self.LED_START).astype(np.uint8)
+
+  def encode(self, pixels, out):
+    """Convert an (n, 4) array of pixels to wire bytes in the (n, 4) array out.
+
+    Brightness values above 100 are treated as 100.
+    """
+    bright = np.minimum(pixels[:, 3], 100)
+    out[:, 0] = self.bright_lut[bright]
+    # Note that rgb_map is 1-indexed for historial reasons, but is convenient here.
+    for channel, column in enumerate(self.rgb_map):
+        out[:, column] = self.color_lut[bright, pixels[:, channel]]
+    return out
 
-  @functools.lru_cache(maxsize=1024)
   def to_cmd(self, pixel):
-    ## if not isinstance(pixel, Pixel):
-    ##  raise TypeError("expected Pixel")
-
-    pixel = self.bright(pixel)
-    # LED startframe is three "1" bits, followed by 5 brightness bits
-    ledstart = pixel.brightness | self.LED_START
+    """Convert a single Pixel to a 4 byte APA102 command."""
+    pixel = np.array([[clamp(n, 0, 255) for n in pixel]], dtype=np.uint8)
+    return self.encode(pixel, np.empty_like(pixel))[0].tolist()
 
-    cmd = [ledstart, 0, 0, 0]
 
-    # Note that rgb_map is 1-indexed for historial reasons, but is convenient here.
-    cmd[self.rgb_map[0]] = clamp(pixel.red, 0, 255)
-    cmd[self.rgb_map[1]] = clamp(pixel.green, 0, 255)
-    cmd[self.rgb_map[2]] = clamp(pixel.blue, 0, 255)
+class Transmitter:
+    """Writes frames to an SPI device from a background thread.
 
-    return cmd
+    write() copies the frame into a back buffer and returns right away, while
+    the thread clocks out the front buffer. If the previous frame hasn't been
+    picked up yet, write() waits for it (back-pressure), so at most one frame
+    is queued. Errors raised by the SPI device are re-raised by the next
+    write() or flush().
+    """
+    def __init__(self, spi):
+        self.spi = spi
+        self._front = bytearray()
+        self._back = bytearray()
+        self._pending = False
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='APA102 transmitter',
+                                        daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        """Queue a copy of frame for transmission."""
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+            self._raise_error()
+            if self._closed:
+                raise ValueError('write to a closed Transmitter')
+            self._back[:] = frame
+            self._pending = True
+            self._cond.notify_all()
+
+    def flush(self):
+        """Wait until all queued frames have been written."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """Write the queued frames and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                self._front, self._back = self._back, self._front
+                self._pending = False
+                self._busy = True
+                self._cond.notify_all()
+            try:
+                self.spi.write(self._front)
+            except Exception as error:
+                self._error = error
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
 
 
 class APA102:
@@ -90,13 +181,21 @@ class APA102:
     Public methods are:
      - set_pixel
      - set_pixel_rgb
+     - set_pixels
+     - fill
+     - gradient
      - show
+     - flush
      - clear_strip
      - cleanup
 
     Helper methods for color manipulation are:
      - combine_color
      - wheel
+     - wheel_rgb
+
+    The pixels property exposes the frame buffer as a NumPy array, which is
+    the fastest way to paint many LEDs at once.
 
     The rest of the methods are used internally and should not be used by the
     user of the library.
@@ -145,9 +244,23 @@ class APA102:
       led_order - If set, allow the use of a logical order that doesn't match
         the physical strip given as a sequence of (first, last) ranges. As a
         compex example, if your strips were connected as:
-        5-6-7-8-0-1-2-3-12-11-10-9
-        then you could set led_order=((5, 8), (0, 3), (12, 9))
+        4-5-6-7-0-1-2-3-11-10-9-8
+        then you could set led_order=((4, 7), (0, 3), (11, 8))
         Tip: runcolorcycle.py can be useful to verify you have these values correct.
+      skip_unchanged - If True, show() doesn't send anything when the encoded
+        frame is identical to the one the strip already shows. Off by default,
+        so an unchanged frame refreshes the whole strip. The number of sent
+        and skipped frames is counted in frames_sent and frames_skipped.
+      threaded - If True, show() hands the frame to a background thread and
+        returns while it is still being sent, so the next frame can be rendered
+        in the meantime. Call flush() to wait until the strip is up to date.
+      segments - If set, the strip is split into several chains, each with
+        its own SPI device, given as a sequence of (count, spi) tuples in
+        physical order. spi is anything with write() and close(), for example
+        Adafruit_GPIO.SPI.SpiDev(1, 0), a BitBang or an FT232H SPI device. The
+        counts must add up to num_led; mosi, sclk, bus, device and
+        max_speed_hz are ignored. All chains are sent in parallel, each with
+        its own end frame, so effects still see a single strip.
     """
     def __init__(self,
                  num_led,
@@ -158,17 +271,43 @@ class APA102:
                  bus=0,
                  device=0,
                  max_speed_hz=8000000,
-                 led_order=None):
+                 led_order=None,
+                 skip_unchanged=False,
+                 threaded=False,
+                 segments=None):
         """Initializes the library."""
 
         rgb_map = RGB_MAP[order.lower()]
         self.pixel_cmd = APA102Cmd(rgb_map, global_brightness)
-        self.leds = [Pixel.BLACK] * num_led
+        # The frame buffer holds 4 bytes per LED (red, green, blue, brightness)
+        # in logical order. It is allocated once and only ever changed in place.
+        self._num_led = num_led
+        self._buf = bytearray(4 * num_led)
+        self._black = bytes(4 * num_led)
+        # A NumPy view onto the same memory, one (R, G, B, brightness) row per LED.
+        self._pixels = np.frombuffer(self._buf, dtype=np.uint8).reshape(num_led, 4)
         self.led_order = led_order
         self._assert_led_order()
         self.BRIGHTNESS = APA102Cmd.BRIGHTNESS
 
-        if mosi is None or mosi < 0: # Debug output
+        # One uint32 per pixel makes finding the changed pixels a single compare.
+        self._buf_words = np.frombuffer(self._buf, dtype=np.uint32)
+        self._shown_words = self._buf_words.copy()
+        self._encode_all = True
+        # rotate() only moves the logical start of the frame buffer: Logical
+        # LED i is stored at (i + _rotation) % num_led. _encoded_rotation is
+        # the rotation the wire buffer was last encoded with.
+        self._rotation = 0
+        self._encoded_rotation = 0
+        self.skip_unchanged = skip_unchanged
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+        if segments is not None:
+            if sum(count for count, _ in segments) != num_led:
+                raise ValueError('segments must add up to {} LEDs'.format(num_led))
+            self.spi = segments[0][1]
+        elif mosi is None or mosi < 0: # Debug output
             # Reset leds_seq so the terminal output makes sense.
             self.led_order = None
             self.spi = debug.DummySPI(rgb_map)
@@ -180,14 +319,52 @@ class APA102:
             else:
                 import Adafruit_GPIO as GPIO
                 self.spi = SPI.BitBang(GPIO.get_platform_gpio(), sclk, mosi)
+        if segments is None:
+            segments = [(num_led, self.spi)]
+
+        # The wire buffer holds a complete transmission for every segment:
+        # Start frame, one 4 byte command per LED in physical order, and the
+        # end frame, padded to whole words. Only the commands of pixels that
+        # changed since the last show() are re-encoded; the frames around them
+        # never move. _slots[physical] is the index of an LED's command in
+        # _wire_words.
+        start_frame = bytes(self.clock_start_frame())
+        self._start_len = len(start_frame)
+        self._segments = []
+        self._wire = bytearray()
+        slots = []
+        first = 0
+        for count, spi in segments:
+            # Several segments are always written in parallel.
+            transmitter = Transmitter(spi) if threaded or len(segments) > 1 else None
+            self._segments.append(Segment(first, count, len(self._wire), spi, transmitter))
+            slots.append(np.arange(count) + (len(self._wire) + self._start_len) // 4)
+            end_len = 4 * ceil(len(self.clock_end_frame(count)) / 4)
+            self._wire += start_frame + bytes(4 * count + end_len)
+            first += count
+        self._wire_words = np.frombuffer(self._wire, dtype=np.uint32)
+        self._slots = np.concatenate(slots)
+        # The number of zero bits that ended the last transmission of each
+        # segment. Nothing is known about the strip before the first one.
+        self._trailing_zeros = [0] * len(self._segments)
+        self._threaded = threaded
+
+        # Compile led_order once: _order[physical] is the logical index sent
+        # at that position, _physical[logical] is the inverse.
+        self._order = np.fromiter(self.order_iter(), dtype=np.intp, count=num_led)
+        self._physical = np.empty_like(self._order)
+        self._physical[self._order] = np.arange(num_led)
 
     def _assert_led_order(self):
         """Raise a ValueError if the given led_order isn't correct."""
 
-        found = set(self.order_iter())
-        need = set(range(len(self.leds)))
+        order = list(self.order_iter())
+        found = set(order)
+        need = set(range(self.num_led))
         if found != need:
             raise ValueError('led_order has gap and/or extra: {}'.format(need.symmetric_difference(found)))
+        if len(order) != len(found):
+            raise ValueError('led_order has duplicates')
 
     def clock_start_frame(self):
         """Sends a start frame to the LED strip.
@@ -198,7 +375,7 @@ class APA102:
         return [0] * 4  # Start frame, 32 zero bits
 
 
-    def clock_end_frame(self):
+    def clock_end_frame(self, num_led=None):
         """Sends an end frame to the LED strip.
 
         As explained above, dummy data must be sent after the last real colour
@@ -221,17 +398,22 @@ class APA102:
         Ultimately, we need to send additional numLEDs/2 arbitrary data bits,
         in order to trigger numLEDs/2 additional clock changes. This driver
         sends zeroes, which has the benefit of getting LED one partially or
-        fully ready for the next update to the strip. An optimized version
-        of the driver could omit the "clockStartFrame" method if enough zeroes have
-        been sent as part of "clockEndFrame".
+        fully ready for the next update to the strip. The end frame is at
+        least 32 bits long, so LED one is always fully ready afterwards and
+        show() can omit the start frame of the next update.
+
+        num_led is the number of LEDs the frame reaches, by default the
+        whole strip.
         """
-        # Round up num_led/2 bits (or num_led/16 bytes)
-        return [0x00] * ceil(self.num_led / 16)
+        if num_led is None:
+            num_led = self.num_led
+        # Round up num_led/2 bits (or num_led/16 bytes), but at least 32 bits
+        return [0x00] * max(ceil(num_led / 16), 4)
 
 
     def blank(self):
         """ Turns off the strip. """
-        self.leds = [Pixel.BLACK] * self.num_led
+        self._buf[:] = self._black
 
 
     def clear_strip(self):
@@ -242,11 +424,65 @@ class APA102:
 
     @property
     def num_led(self):
-      return len(self.leds)
+      return self._num_led
+
+
+    @property
+    def leds(self):
+        """A list of Pixels with a copy of the current frame buffer."""
+        return [self[i] for i in range(self.num_led)]
+
+
+    @property
+    def pixels(self):
+        """The frame buffer as a writable (num_led, 4) uint8 NumPy array.
+
+        Columns are red, green, blue and brightness. Writes go straight to the
+        frame buffer, so effects can use slicing and broadcasting:
+        strip.pixels[10:20] = (255, 0, 0, 100)
+
+        After rotate() the frame buffer is put back into logical order the
+        next time this property is read, so fetch it again after rotating.
+        """
+        if self._rotation:
+            self._unrotate()
+        return self._pixels
+
+
+    def _unrotate(self):
+        """Move the frame buffer (and the copy of the last encoded one)
+        so that logical LED 0 is stored first again.
+        """
+        offset = self._rotation
+        self._buf_words[:] = np.roll(self._buf_words, -offset)
+        self._shown_words[:] = np.roll(self._shown_words, -offset)
+        self._encoded_rotation = (self._encoded_rotation - offset) % self.num_led
+        self._rotation = 0
+
+
+    def _offset(self, key):
+        """Return the frame buffer offset of the LED at index key."""
+        if key < 0:
+            key += self.num_led
+        if key < 0 or key >= self.num_led:
+            raise IndexError('LED index out of range: {}'.format(key))
+        return 4 * ((key + self._rotation) % self.num_led)
+
+
+    def _store(self, offset, red, green, blue, brightness):
+        """Write one clamped pixel into the frame buffer at offset."""
+        buf = self._buf
+        buf[offset] = clamp(int(red), 0, 255)
+        buf[offset + 1] = clamp(int(green), 0, 255)
+        buf[offset + 2] = clamp(int(blue), 0, 255)
+        buf[offset + 3] = clamp(int(brightness), 0, 100)
 
 
     def __getitem__(self, key):
-        return self.leds[key]
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(self.num_led))]
+        offset = self._offset(key)
+        return Pixel._make(self._buf[offset:offset + 4])
 
 
     def __setitem__(self, key, item):
@@ -255,12 +491,14 @@ class APA102:
         or
         strip[12] = (255, 255, 0) # 100% Brightness yellow
         """
-        if isinstance(item, Pixel):
-            self.leds[key] = item
-        elif len(item) == 4:
-            self.leds[key] = Pixel(*item)
+        if isinstance(key, slice):
+            for i, pixel in zip(range(*key.indices(self.num_led)), item):
+                self[i] = pixel
+            return
+        if len(item) == 4:
+            self._store(self._offset(key), *item)
         elif len(item) == 3:
-            self.leds[key] = Pixel(*item, brightness=100)
+            self._store(self._offset(key), *item, 100)
         else:
             raise ValueError('unknown type for Pixel: {}'.format(item))
 
@@ -275,7 +513,7 @@ class APA102:
         if led_num < 0 or led_num >= self.num_led:
             raise ValueError('attempt to set invalid LED: {}'.format(led_num))
 
-        self.leds[led_num] = Pixel(red, green, blue, bright_percent)
+        self._store(self._offset(led_num), red, green, blue, bright_percent)
 
     def set_pixel_rgb(self, led_num, rgb_color, bright_percent=100):
         """Sets the color of one pixel in the LED stripe.
@@ -295,15 +533,69 @@ class APA102:
                         bright_percent)
 
 
+    @staticmethod
+    def _color_array(colors, bright_percent=100):
+        """Convert colors to an (..., 4) array clipped to the valid ranges.
+
+        Colors with only three channels get bright_percent as their brightness.
+        """
+        colors = np.asarray(colors)
+        if colors.shape[-1] == 3:
+            bright = np.full(colors.shape[:-1] + (1,), bright_percent)
+            colors = np.concatenate((colors, bright), axis=-1)
+        elif colors.shape[-1] != 4:
+            raise ValueError('unknown type for Pixel: {}'.format(colors))
+        return np.clip(colors, 0, (255, 255, 255, 100)).astype(np.uint8)
+
+
+    def set_pixels(self, indices, colors, bright_percent=100):
+        """Sets the color of many pixels at once.
+
+        indices may be anything that indexes a NumPy array: a sequence of LED
+        numbers, a slice or a boolean mask. colors is either one color that is
+        used for all pixels, or a sequence with one color per pixel. Colors
+        with only red, green and blue get bright_percent as their brightness.
+        """
+        if self._rotation:
+            indices = (np.arange(self.num_led)[indices] + self._rotation) % self.num_led
+        self._pixels[indices] = self._color_array(colors, bright_percent)
+
+
+    def fill(self, start, end, color):
+        """Sets the pixels from start to end (both inclusive) to one color.
+
+        start may be larger than end.
+        """
+        self.set_pixels(slice(min(start, end), max(start, end) + 1), color)
+
+
+    def gradient(self, start, end, color0, color1):
+        """Fades the pixels from start to end (both inclusive) linearly from
+        color0 to color1. Brightness is faded as well.
+
+        start may be larger than end, the fade then runs backwards: The pixel
+        at start still gets color0 and the one at end gets color1.
+        """
+        if start > end:
+            start, end, color0, color1 = end, start, color1, color0
+        color0 = self._color_array(color0).astype(float)
+        color1 = self._color_array(color1).astype(float)
+        steps = np.linspace(0.0, 1.0, end - start + 1)[:, np.newaxis]
+        self.set_pixels(slice(start, end + 1),
+                        np.rint(color0 + (color1 - color0) * steps))
+
+
     def rotate(self, positions=1):
         """ Rotate the LEDs by the specified number of positions.
 
         Treating the internal LED array as a circular buffer, rotate it by
         the specified number of positions. The number could be negative,
         which means rotating in the opposite direction.
+
+        No pixel is moved here: The rotation is kept as an offset into the
+        frame buffer and applied when the frame is encoded by show().
         """
-        cutoff = positions % self.num_led
-        self.leds = self.leds[cutoff:] + self.leds[:cutoff]
+        self._rotation = (self._rotation + positions) % self.num_led
 
 
     def order_iter(self):
@@ -313,26 +605,132 @@ class APA102:
             return range(self.num_led)
 
         order = []
-        for s in led_order:
+        for s in self.led_order:
             if s[0] < s[1]:
                 order.append(range(s[0], s[1] + 1, 1))
             else:
-                order.append(range(s[1], s[0] - 1, -1))
+                order.append(range(s[0], s[1] - 1, -1))
 
         return itertools.chain(*order)
 
-    def show(self):
-        """Sends the content of the pixel buffer to the strip."""
+    def show(self, dirty=None, force=False):
+        """Sends the content of the pixel buffer to the strip.
+
+        LEDs keep their color until they receive a new one, so the
+        transmission stops right after the last LED (in physical order) whose
+        command changed since the previous show(). If no command changed, for
+        example because a new color rounds to the same wire bytes, the whole
+        strip is refreshed (or, with skip_unchanged on, the frame is skipped).
+
+        dirty - Optional (first, last) range of LEDs, both inclusive. If given,
+          only changes within this range are looked for; changes outside of it
+          are picked up by a later show().
+        force - If True, send a full start frame and every LED, whether it
+          changed or not. Use this if the strip may have lost its colors, for
+          example after a power glitch.
+
+        With threaded=True the frame is only queued here; show() waits for
+        the previous frame to be picked up, but not for this one to be sent.
+        """
+        if force:
+            self._resync()
+        changed = self._encode(dirty)
+        if not changed.size:
+            if self.skip_unchanged:
+                self.frames_skipped += 1
+                return
+            changed = np.array([seg.first + seg.count - 1 for seg in self._segments])
+        # Each segment is cut off after its own last changed LED, and left
+        # alone if none of its LEDs changed.
+        for index, segment in enumerate(self._segments):
+            stop = segment.first + segment.count
+            last = changed[(changed >= segment.first) & (changed < stop)]
+            if last.size:
+                self._transmit(index, last.max() - segment.first + 1)
+        if not self._threaded:
+            self.flush()
+        self.frames_sent += 1
+
+
+    def _transmit(self, index, num_led):
+        """Send the start frame, the first num_led LED commands and a matching
+        end frame of the segment at index from the wire buffer.
+
+        The start frame is shortened by the zero bits that ended the previous
+        transmission, which LED one has already seen.
+        """
+        segment = self._segments[index]
+        wire = self._wire
+        missing = max(0, 8 * self._start_len - self._trailing_zeros[index])
+        start = segment.offset + self._start_len - ceil(missing / 8)
+        stop = segment.offset + self._start_len + 4 * num_led
+        end_len = len(self.clock_end_frame(num_led))
+        # Temporarily overwrite the commands behind the last LED with the
+        # (shorter) end frame, so the frame goes out in one piece.
+        hidden = wire[stop:stop + end_len]
+        wire[stop:stop + end_len] = bytes(end_len)
+        try:
+            frame = memoryview(wire)[start:stop + end_len]
+            if segment.transmitter is None:
+                segment.spi.write(frame)
+            else:
+                segment.transmitter.write(frame)
+            # Zero bits at the end of the last LED command are not counted.
+            self._trailing_zeros[index] = 8 * end_len
+        except Exception:
+            self._resync()
+            raise
+        finally:
+            wire[stop:stop + end_len] = hidden
+
+    def _resync(self):
+        """Forget what the strip shows after a failed write.
+
+        The next show() sends a full start frame and every LED.
+        """
+        self._encode_all = True
+        self._trailing_zeros = [0] * len(self._segments)
 
-        cmds = self.clock_start_frame()
-        # SPI takes up to 4096 Integers. So we are fine for up to 1024 LEDs.
-        for led_i in self.order_iter():
-            cmds.extend(self.pixel_cmd.to_cmd(self.leds[led_i]))
-        cmds.extend(self.clock_end_frame())
+    def _encode(self, dirty=None):
+        """Bring the wire buffer up to date with the frame buffer.
 
-        for i in range(0, len(cmds), 4096):
-            sub_cmd = cmds[i:i+4096]
-            self.spi.write(sub_cmd)
+        Pixels are compared with the copy taken at the last encode, and only
+        the ones that differ are converted again. Returns an array with the
+        physical indices of the LEDs whose command changed.
+        """
+        num_led = self.num_led
+        rotation = self._rotation
+        if self._encode_all or rotation != self._encoded_rotation:
+            # Every LED may have moved: Gather the whole frame in physical
+            # order, with the rotation folded into the led_order lookup.
+            pixels = self._pixels[(self._order + rotation) % num_led]
+            self._shown_words[:] = self._buf_words
+            self._encoded_rotation = rotation
+            physical = np.arange(num_led)
+            if self._encode_all:
+                words = self.pixel_cmd.encode(pixels, np.empty_like(pixels))
+                self._wire_words[self._slots] = words.view(np.uint32).ravel()
+                self._encode_all = False
+                return physical
+        else:
+            first, last = (0, num_led - 1) if dirty is None else dirty
+            if rotation:
+                index = (np.arange(first, last + 1) + rotation) % num_led
+                dirty = index[self._buf_words[index] != self._shown_words[index]]
+            else:
+                changed = self._buf_words[first:last + 1] != self._shown_words[first:last + 1]
+                dirty = np.flatnonzero(changed) + first
+            if not dirty.size:
+                return dirty
+            pixels = self._pixels[dirty]
+            self._shown_words[dirty] = self._buf_words[dirty]
+            physical = self._physical[(dirty - rotation) % num_led]
+        # Keep only the commands that really differ from what was sent.
+        words = self.pixel_cmd.encode(pixels, np.empty_like(pixels)).view(np.uint32).ravel()
+        slots = self._slots[physical]
+        changed = words != self._wire_words[slots]
+        self._wire_words[slots[changed]] = words[changed]
+        return physical[changed]
 
 
     def __enter__(self):
@@ -342,10 +740,31 @@ class APA102:
         self.clear_strip()
         self.cleanup()
 
+    def flush(self):
+        """Wait until the frames passed to show() have been sent.
+
+        Only needed with threaded=True; Otherwise show() returns after sending.
+        """
+        try:
+            for segment in self._segments:
+                if segment.transmitter is not None:
+                    segment.transmitter.flush()
+        except Exception:
+            # A frame that was queued earlier did not make it to the strip.
+            self._resync()
+            raise
+
+
     def cleanup(self):
         """Release the SPI device; Call this method at the end"""
 
-        self.spi.close()  # Close SPI port
+        try:
+            for segment in self._segments:
+                if segment.transmitter is not None:
+                    segment.transmitter.close()
+        finally:
+            for segment in self._segments:
+                segment.spi.close()  # Close SPI port
 
     @staticmethod
     def combine_color(red, green, blue):
@@ -369,6 +788,24 @@ class APA102:
         return self.combine_color(0, wheel_pos * 3, 255 - wheel_pos * 3)
 
 
+    @staticmethod
+    def wheel_rgb(wheel_pos):
+        """Vectorized wheel: Return an (..., 3) array of red, green and blue
+        for an array of wheel positions.
+        """
+        pos = np.minimum(np.asarray(wheel_pos, dtype=int), 255)
+        # Green -> Red, Red -> Blue, Blue -> Green. Position 85 belongs to the
+        # first third and 170 to the second, just like in wheel().
+        third = np.where(pos <= 85, 0, np.where(pos <= 170, 1, 2))
+        rising = (pos - 85 * third) * 3
+        falling = 255 - rising
+        rgb = np.empty(pos.shape + (3,), dtype=int)
+        rgb[..., 0] = np.choose(third, (rising, falling, 0))
+        rgb[..., 1] = np.choose(third, (falling, 0, rising))
+        rgb[..., 2] = np.choose(third, (0, rising, falling))
+        return rgb
+
+
     def dump_array(self):
         """For debug purposes: Dump the LED array onto the console."""
 
@@ -2,6 +2,32 @@
 import time
 import apa102
 
+def merge_repaint(results):
+    """Combine the return values of several updaters into one.
+
+    An updater returns 0 if nothing needs to be repainted, a (first, last)
+    range of LEDs (both inclusive) if only those changed, or any other true
+    value if the whole strip may have changed. The result follows the same
+    convention.
+    """
+    span = None
+    repaint_all = False
+    # Go through all results, they may come from a generator that calls the
+    # updaters one by one.
+    for result in results:
+        if not result:
+            continue
+        if not isinstance(result, tuple):
+            repaint_all = True
+            continue
+        if span is None:
+            span = result
+        else:
+            span = (min(span[0], result[0]), max(span[1], result[1]))
+    if repaint_all:
+        return 1
+    return 0 if span is None else span
+
 class ColorCycleTemplate:
     """This class is the basis of all color cycles.
 
@@ -60,6 +86,10 @@ class ColorCycleTemplate:
           (so for this case, the numStepsPerCycle should be equal to numLEDs).
         current_cycle: Starts with zero, and goes up by one whenever a full
           cycle has completed.
+
+        Returns 0 if the strip doesn't need to be repainted, a (first, last)
+        range if only the LEDs from first to last (both inclusive) were
+        changed, or 1 to repaint everything.
         """
 
         raise NotImplementedError("Please implement the update() method")
@@ -98,14 +128,15 @@ class ColorCycleTemplate:
             end_time = next_time + self.duration_s if self.duration_s > 0 else None
             while True:  # Loop forever
                 for current_step in range (self.num_steps_per_cycle):
-                    need_repaint = sum((
+                    need_repaint = merge_repaint((
                         update(strip, self.num_led, self.num_steps_per_cycle,
                                current_step, current_cycle)
                         for update in self.updaters))
                     time.sleep(max(0, next_time-time.time()))
                     next_time += self.pause_value
                     if need_repaint:
-                        strip.show() # repaint if required
+                        # repaint if required
+                        strip.show(need_repaint if isinstance(need_repaint, tuple) else None)
                     if end_time and time.time() > end_time:
                         break
                 if end_time and time.time() > end_time:
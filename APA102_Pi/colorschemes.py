@@ -3,7 +3,9 @@
 from math import ceil, floor, sqrt
 from random import randint
 
-from colorcycletemplate import ColorCycleTemplate
+import numpy as np
+
+from colorcycletemplate import ColorCycleTemplate, merge_repaint
 from apa102 import Pixel
 
 class StrandTest(ColorCycleTemplate):
@@ -42,14 +44,13 @@ class TheaterChase(ColorCycleTemplate):
         # Note: For a smooth transition between cycles, numStepsPerCycle must
         # be a multiple of 7
         start_index = current_step % 7 # One segment is 2 blank, and 5 filled
-        color_index = strip.wheel(int(round(255/num_steps_per_cycle *
-                                            current_step, 0)))
-        for pixel in range(num_led):
-            # Two LEDs out of 7 are blank. At each step, the blank
-            # ones move one pixel ahead.
-            if ((pixel+start_index) % 7 == 0) or ((pixel+start_index) % 7 == 1):
-                strip.set_pixel_rgb(pixel, 0, strip.BRIGHTNESS)
-            else: strip.set_pixel_rgb(pixel, color_index, strip.BRIGHTNESS)
+        color = strip.wheel_rgb(int(round(255/num_steps_per_cycle *
+                                          current_step, 0)))
+        # Two LEDs out of 7 are blank. At each step, the blank
+        # ones move one pixel ahead.
+        blank = (np.arange(num_led) + start_index) % 7 < 2
+        colors = np.where(blank[:, np.newaxis], 0, color)
+        strip.set_pixels(slice(0, num_led), colors, strip.BRIGHTNESS)
         return 1
 
 
@@ -163,14 +164,13 @@ class Rainbow(ColorCycleTemplate):
         #     number of LEDs
         scale_factor = 255 / num_led # Index change between two neighboring LEDs
         start_index = 255 / num_steps_per_cycle * current_step # LED 0
-        for i in range(num_led):
-            # Index of LED i, not rounded and not wrapped at 255
-            led_index = start_index + i * scale_factor
-            # Now rounded and wrapped
-            led_index_rounded_wrapped = int(round(led_index, 0)) % 255
-            # Get the actual color out of the wheel
-            pixel_color = strip.wheel(led_index_rounded_wrapped)
-            strip.set_pixel_rgb(i, pixel_color, strip.BRIGHTNESS)
+        # Index of every LED, not rounded and not wrapped at 255
+        led_index = start_index + np.arange(num_led) * scale_factor
+        # Now rounded and wrapped
+        led_index_rounded_wrapped = np.rint(led_index).astype(int) % 255
+        # Get the actual colors out of the wheel
+        pixel_colors = strip.wheel_rgb(led_index_rounded_wrapped)
+        strip.set_pixels(slice(0, num_led), pixel_colors, strip.BRIGHTNESS)
         return 1 # All pixels are set in the buffer, so repaint the strip now
 
 
@@ -185,8 +185,9 @@ def add_delay(delay_pct, *updaters):
         delay = round(delay_pct * num_steps_per_cycle)
         if current_step < delay:
             return 0
-        return sum((u(strip, num_led, num_steps_per_cycle, current_step - delay, current_cycle)
-                    for u in updaters))
+        return merge_repaint((u(strip, num_led, num_steps_per_cycle,
+                                current_step - delay, current_cycle)
+                              for u in updaters))
     return update
 
 
@@ -207,7 +208,7 @@ def create_solid(start, end, pixel):
             return 0
         for i in range(start, end+1):
             strip[i] = pixel
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 
@@ -237,7 +238,7 @@ def create_larson(start, end, width):
                 strip[i] = Pixel(255, 0, 0, bright)
             bright -= b_step
 
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 def create_fire(start, end):
@@ -249,7 +250,7 @@ def create_fire(start, end):
         for i in range(start, end+1):
             flicker = randint(0, 16)
             strip[i] = Pixel(r-flicker, g-flicker, b-flicker, 16)
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 def create_red_alert(start, end):
@@ -261,7 +262,7 @@ def create_red_alert(start, end):
         lamp = Pixel(255, 0, 0, brightness)
         for i in range(start, end+1):
             strip[i] = lamp
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 def create_swipe(start, end):
@@ -283,7 +284,7 @@ def create_swipe(start, end):
         else:
             for i in range(start, end-1, -1):
                 strip[i] = strip[i-shift] if i-shift >= end else Pixel.BLACK
-        return 1 # Repaint
+        return (min(start, end), max(start, end)) # Repaint
     return update
 
 def create_morse(start, end, color, msg):
@@ -360,7 +361,7 @@ def create_morse(start, end, color, msg):
                current_cycle):
         for i in range(start, end+1):
             strip[i] = msg_lamp[(i+current_step)%len(msg_lamp)]
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 
@@ -383,7 +384,7 @@ def create_lin_fade(start, end, hold_pct=0.1, direction=1):
         for i in range(start, end+1):
             # Copy all the colors and change brightness.
             strip[i] = Pixel(*strip[i][0:3], brightness=brightness)
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
 
 def create_exp_fade(start, end, exp=0.5, hold_pct=0.1, direction=1):
@@ -407,5 +408,5 @@ def create_exp_fade(start, end, exp=0.5, hold_pct=0.1, direction=1):
         for i in range(start, end+1):
             # Copy all the colors and change brightness.
             strip[i] = Pixel(*strip[i][0:3], brightness=brightness)
-        return 1 # Repaint
+        return (start, end) # Repaint
     return update
@@ -11,6 +11,10 @@ class DummySPI():
 
     def __init__(self, rgb_order):
         self.order = rgb_order
+        # Decoder state, kept across writes: The number of zero bytes seen
+        # in a row, and the LED frame being received (None between updates).
+        self.zeros = 0
+        self.frame = None
 
     @functools.lru_cache(maxsize=1024)
     def led_out(self, lamp):
@@ -19,13 +23,26 @@ class DummySPI():
         return '\x1b[48;2;{};{};{}m '.format(r, g, b)
 
     def write(self, byte_seq):
-        # Process in 4-byte chunks as god intended.
+        # Decode the stream like the first LED of a strip would: After 32 zero
+        # bits, a byte with the start bits begins an update, which lasts as
+        # long as 4 byte LED frames follow each other.
         buf = ''
-        for x in list(zip(*[byte_seq[i::4] for i in range(4)])):
-            if x == (0x00, 0x00, 0x00, 0x00):
+        for byte in bytes(byte_seq):
+            if self.frame is not None:
+                if self.frame or (byte & DummySPI.LED_START) == DummySPI.LED_START:
+                    self.frame.append(byte)
+                    if len(self.frame) == 4:
+                        buf += self.led_out(tuple(self.frame))
+                        self.frame = []
+                    continue
+                self.frame = None
+            if byte == 0x00:
+                self.zeros += 1
+                continue
+            if self.zeros >= 4 and (byte & DummySPI.LED_START) == DummySPI.LED_START:
                 buf += '\r'
-            elif (x[0] & DummySPI.LED_START) == DummySPI.LED_START:
-                buf += self.led_out(x)
+                self.frame = [byte]
+            self.zeros = 0
 
         print(buf + DummySPI.RESET_COLOR + DummySPI.HIDE_CURSOR, end='', flush=True)
 
@@ -0,0 +1,430 @@
+"""Protocol level tests for the APA102 driver.
+
+The strip is simulated bit by bit: Every LED forwards its input, arms itself
+after 32 zero bits, then latches the next 32 bit frame (starting with a 1 bit)
+and sends zeroes while doing so. Every second LED delays the data by one bit,
+which is what the end frame has to make up for. After each show() the
+latched command of every LED must be the one for its logical pixel.
+
+Run with: python3 -m pytest test_apa102.py
+"""
+import threading
+import unittest
+
+from apa102 import APA102, Pixel, Transmitter
+
+
+class SimulatedChain:
+    """A chain of APA102 LEDs that is written like an SPI device."""
+
+    FORWARD, ARMED, LATCHING = range(3)
+
+    def __init__(self, num_led):
+        self.num_led = num_led
+        self.latched = [None] * num_led
+        self.writes = []
+        self._mode = [self.FORWARD] * num_led
+        self._zeros = [0] * num_led
+        self._frame = [0] * num_led
+        self._bits = [0] * num_led
+        self._delay = [0] * num_led
+
+    def _clock(self, bit):
+        for i in range(self.num_led):
+            if i % 2:
+                bit, self._delay[i] = self._delay[i], bit
+            out = bit
+            if self._mode[i] == self.LATCHING:
+                self._frame[i] = self._frame[i] << 1 | bit
+                self._bits[i] += 1
+                out = 0
+                if self._bits[i] == 32:
+                    self.latched[i] = list(self._frame[i].to_bytes(4, 'big'))
+                    self._mode[i] = self.FORWARD
+            elif self._mode[i] == self.ARMED and bit:
+                self._mode[i] = self.LATCHING
+                self._frame[i] = 1
+                self._bits[i] = 1
+                out = 0
+            self._zeros[i] = self._zeros[i] + 1 if bit == 0 else 0
+            if self._mode[i] == self.FORWARD and self._zeros[i] >= 32:
+                self._mode[i] = self.ARMED
+            bit = out
+
+    def write(self, data):
+        data = bytes(data)
+        self.writes.append(data)
+        for byte in data:
+            for shift in range(7, -1, -1):
+                self._clock(byte >> shift & 1)
+
+    def close(self):
+        pass
+
+
+class FailingChain(SimulatedChain):
+    """A chain whose next write fails halfway if fail is set."""
+
+    fail = False
+
+    def write(self, data):
+        if self.fail:
+            self.fail = False
+            super().write(bytes(data)[:len(data) // 2])
+            raise IOError('write failed')
+        super().write(data)
+
+
+def colors(num_led, seed=0):
+    """A list of distinct pixels."""
+    return [Pixel((7 * i + seed) % 256, (13 * i + 50) % 256, (29 * i + seed) % 256,
+                  (i * 3 + seed) % 101) for i in range(num_led)]
+
+
+class TestAPA102Stream(unittest.TestCase):
+
+    def create(self, num_led, counts=None, **kwargs):
+        """Create a strip on simulated chains with the given LED counts."""
+        counts = counts or [num_led]
+        chains = [SimulatedChain(count) for count in counts]
+        strip = APA102(num_led, segments=list(zip(counts, chains)), **kwargs)
+        self.addCleanup(strip.cleanup)
+        return strip, chains
+
+    def assertLatched(self, strip, chains):
+        """Every LED shows the command of the logical pixel mapped to it."""
+        latched = [cmd for chain in chains for cmd in chain.latched]
+        for physical, cmd in enumerate(latched):
+            logical = strip._order[physical]
+            expected = strip.pixel_cmd.to_cmd(strip[int(logical)])
+            self.assertEqual(cmd, expected, 'LED {} (logical {})'.format(physical, logical))
+
+    def test_full_frame(self):
+        strip, chains = self.create(20)
+        strip[:] = colors(20)
+        strip.show()
+        self.assertLatched(strip, chains)
+
+    def test_start_frame_is_elided(self):
+        strip, chains = self.create(20)
+        strip[:] = colors(20)
+        strip.show()
+        self.assertEqual(chains[0].writes[0][:4], bytes(4))
+        for seed in range(1, 4):
+            strip[:] = colors(20, seed)
+            strip.show()
+            # The end frame of the previous write primed LED one.
+            self.assertNotEqual(chains[0].writes[-1][0], 0)
+            self.assertLatched(strip, chains)
+
+    def test_failed_write_sends_start_frame(self):
+        chain = FailingChain(10)
+        strip = APA102(10, segments=[(10, chain)])
+        self.addCleanup(strip.cleanup)
+        strip[:] = colors(10)
+        strip.show()
+        chain.fail = True
+        strip[:] = colors(10, 1)
+        self.assertRaises(IOError, strip.show)
+        strip[:] = colors(10, 2)
+        strip.show()
+        self.assertEqual(chain.writes[-1][:4], bytes(4))
+        self.assertLatched(strip, [chain])
+
+    def test_failed_write_of_one_led_is_resent(self):
+        chain = FailingChain(10)
+        strip = APA102(10, segments=[(10, chain)])
+        self.addCleanup(strip.cleanup)
+        strip[:] = colors(10)
+        strip.show()
+        chain.fail = True
+        strip[9] = Pixel.RED
+        self.assertRaises(IOError, strip.show)
+        # Nothing changed since, but the strip still has to be repainted.
+        strip.show()
+        self.assertEqual(chain.writes[-1][:4], bytes(4))
+        self.assertLatched(strip, [chain])
+
+    def test_failed_threaded_write_is_resent(self):
+        chain = FailingChain(10)
+        strip = APA102(10, segments=[(10, chain)], threaded=True)
+        self.addCleanup(strip.cleanup)
+        strip[:] = colors(10)
+        strip.show()
+        strip.flush()
+        chain.fail = True
+        strip[9] = Pixel.RED
+        strip.show()
+        self.assertRaises(IOError, strip.flush)
+        strip.show()
+        strip.flush()
+        self.assertEqual(chain.writes[-1][:4], bytes(4))
+        self.assertLatched(strip, [chain])
+
+    def test_prefix_truncation(self):
+        strip, chains = self.create(40)
+        strip[:] = colors(40)
+        strip.show()
+        strip[3] = Pixel.RED
+        strip.show()
+        # Four LED commands and the shortest end frame, no start frame.
+        self.assertEqual(len(chains[0].writes[-1]), 4 * 4 + 4)
+        self.assertLatched(strip, chains)
+        strip[39] = Pixel.BLUE
+        strip[0] = Pixel.GREEN
+        strip.show()
+        self.assertLatched(strip, chains)
+
+    def test_unchanged_frame_is_skipped(self):
+        strip, chains = self.create(10, skip_unchanged=True)
+        strip[:] = colors(10)
+        strip.show()
+        strip[5] = strip[5]
+        strip.show()
+        self.assertEqual(len(chains[0].writes), 1)
+        self.assertEqual(strip.frames_skipped, 1)
+
+    def test_unchanged_frame_refreshes_strip(self):
+        strip, chains = self.create(10)
+        strip[:] = colors(10)
+        strip.show()
+        strip.show()
+        self.assertEqual(len(chains[0].writes), 2)
+        self.assertEqual(len(chains[0].writes[-1]), len(chains[0].writes[0]) - 4)
+        self.assertEqual(strip.frames_skipped, 0)
+        self.assertLatched(strip, chains)
+
+    def test_force_sends_every_led(self):
+        strip, chains = self.create(30, counts=[12, 18], skip_unchanged=True)
+        strip[:] = colors(30)
+        strip.show()
+        strip[2] = Pixel.RED
+        strip.show(force=True)
+        for chain in chains:
+            self.assertEqual(chain.writes[-1][:4], bytes(4))
+            self.assertEqual(len(chain.writes[-1]), len(chain.writes[0]))
+            # Forget what was latched, the forced frame must repaint all.
+            chain.latched = [None] * chain.num_led
+        strip.show(force=True)
+        self.assertEqual(strip.frames_skipped, 0)
+        self.assertLatched(strip, chains)
+
+    def test_led_order(self):
+        strip, chains = self.create(12, led_order=((4, 7), (0, 3), (11, 8)))
+        strip[:] = colors(12)
+        strip.show()
+        self.assertLatched(strip, chains)
+        strip[9] = Pixel.YELLOW
+        strip.show()
+        self.assertLatched(strip, chains)
+
+    def test_rotation(self):
+        strip, chains = self.create(12, led_order=((6, 11), (5, 0)))
+        strip[:] = colors(12)
+        strip.show()
+        for positions in (1, 5, -3):
+            strip.rotate(positions)
+            strip.show()
+            self.assertLatched(strip, chains)
+        strip.rotate(2)
+        strip[4] = Pixel.MAGENTA
+        strip.show()
+        self.assertLatched(strip, chains)
+        strip.pixels[0] = (1, 2, 3, 50)
+        strip.show()
+        self.assertLatched(strip, chains)
+
+    def test_pixels_write_after_rotate(self):
+        strip, chains = self.create(12, counts=[5, 7], led_order=((6, 11), (5, 0)))
+        strip[:] = colors(12)
+        strip.show()
+        strip.rotate(4)
+        # No show() in between: The rotation is still pending when the
+        # frame buffer is written through the array.
+        strip.pixels[:] = [tuple(pixel) for pixel in colors(12, 1)]
+        self.assertEqual(strip.leds, colors(12, 1))
+        strip.show()
+        self.assertLatched(strip, chains)
+        strip.show()
+        strip.rotate(-7)
+        strip.pixels[2:5] = (9, 8, 7, 60)
+        self.assertEqual(strip[3], Pixel(9, 8, 7, 60))
+        strip.show()
+        self.assertLatched(strip, chains)
+
+    def test_segments(self):
+        strip, chains = self.create(30, counts=[12, 18])
+        strip[:] = colors(30)
+        strip.show()
+        self.assertLatched(strip, chains)
+        strip[20] = Pixel.CYAN
+        strip.show()
+        # Only the second chain changed.
+        self.assertEqual(len(chains[0].writes), 1)
+        self.assertEqual(len(chains[1].writes), 2)
+        self.assertLatched(strip, chains)
+
+    def test_segments_with_rotation(self):
+        strip, chains = self.create(16, counts=[8, 8], led_order=((15, 8), (0, 7)))
+        strip[:] = colors(16)
+        strip.show()
+        strip.rotate(3)
+        strip.show()
+        self.assertLatched(strip, chains)
+
+
+class TestAPA102Pixels(unittest.TestCase):
+
+    def setUp(self):
+        self.strip = APA102(10, segments=[(10, SimulatedChain(10))])
+        self.addCleanup(self.strip.cleanup)
+
+    def test_set_pixels(self):
+        strip = self.strip
+        strip.set_pixels([1, 3], [(1, 2, 3), (4, 5, 6)], bright_percent=50)
+        self.assertEqual(strip[1], Pixel(1, 2, 3, 50))
+        self.assertEqual(strip[3], Pixel(4, 5, 6, 50))
+        strip.set_pixels(slice(5, 7), (300, -1, 7, 120))
+        self.assertEqual(strip[5], Pixel(255, 0, 7, 100))
+        self.assertEqual(strip[6], Pixel(255, 0, 7, 100))
+        mask = [i % 2 == 0 for i in range(10)]
+        strip.set_pixels(mask, Pixel.BLUE)
+        self.assertEqual([strip[i] == Pixel.BLUE for i in range(10)], mask)
+        self.assertRaises(ValueError, strip.set_pixels, 0, (1, 2))
+
+    def test_fill(self):
+        strip = self.strip
+        strip.fill(2, 4, Pixel.RED)
+        strip.fill(8, 7, Pixel.GREEN)
+        expected = [Pixel(0, 0, 0, 0)] * 10
+        expected[2:5] = [Pixel.RED] * 3
+        expected[7:9] = [Pixel.GREEN] * 2
+        self.assertEqual(strip.leds, expected)
+
+    def test_gradient(self):
+        strip = self.strip
+        strip.gradient(0, 4, (0, 0, 0, 0), (200, 100, 40, 100))
+        self.assertEqual(strip[0], Pixel(0, 0, 0, 0))
+        self.assertEqual(strip[2], Pixel(100, 50, 20, 50))
+        self.assertEqual(strip[4], Pixel(200, 100, 40, 100))
+        strip.gradient(9, 5, (0, 0, 0, 0), (200, 100, 40, 100))
+        self.assertEqual(strip.leds[5:], strip.leds[4::-1])
+
+    def test_wheel_rgb(self):
+        strip = self.strip
+        rgb = strip.wheel_rgb(range(256))
+        for pos in range(256):
+            self.assertEqual(strip.combine_color(*rgb[pos]), strip.wheel(pos))
+        self.assertEqual(strip.wheel_rgb([[300]]).shape, (1, 1, 3))
+
+    def test_pixels_after_rotate(self):
+        strip = self.strip
+        strip[:] = colors(10)
+        strip.rotate(3)
+        leds = strip.leds
+        self.assertEqual([Pixel(*map(int, row)) for row in strip.pixels], leds)
+        strip.rotate(-1)
+        self.assertEqual(strip.leds, leds[-1:] + leds[:-1])
+        self.assertEqual([Pixel(*map(int, row)) for row in strip.pixels], strip.leds)
+
+
+class RecordingSPI:
+    """An SPI device that records its writes and can hold or fail them."""
+
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+        self.closed = False
+
+    def write(self, data):
+        self.release.wait()
+        if self.fail:
+            self.fail = False
+            raise IOError('write failed')
+        self.writes.append(bytes(data))
+
+    def close(self):
+        self.closed = True
+
+
+class TestTransmitter(unittest.TestCase):
+
+    def setUp(self):
+        self.spi = RecordingSPI()
+        self.transmitter = Transmitter(self.spi)
+        self.addCleanup(self.transmitter.close)
+        self.addCleanup(self.spi.release.set)
+
+    def test_frames_are_copied(self):
+        frame = bytearray(b'abc')
+        self.transmitter.write(frame)
+        frame[:] = b'xyz'
+        self.transmitter.write(frame)
+        self.transmitter.flush()
+        self.assertEqual(self.spi.writes, [b'abc', b'xyz'])
+
+    def test_back_pressure(self):
+        self.spi.release.clear()
+        # The thread picks up the first frame and blocks in the SPI write,
+        # the second one waits in the back buffer.
+        self.transmitter.write(b'1')
+        self.transmitter.write(b'2')
+        writer = threading.Thread(target=self.transmitter.write, args=(b'3',))
+        writer.start()
+        writer.join(0.1)
+        self.assertTrue(writer.is_alive())
+        self.spi.release.set()
+        writer.join()
+        self.transmitter.flush()
+        self.assertEqual(self.spi.writes, [b'1', b'2', b'3'])
+
+    def test_error_is_raised_by_flush(self):
+        self.spi.fail = True
+        self.transmitter.write(b'1')
+        self.assertRaises(IOError, self.transmitter.flush)
+        # The error is only raised once.
+        self.transmitter.write(b'2')
+        self.transmitter.flush()
+        self.assertEqual(self.spi.writes, [b'2'])
+
+    def test_error_is_raised_by_write(self):
+        self.spi.fail = True
+        self.transmitter.write(b'1')
+        # The first write may return before the error is known, the second
+        # one waits until the failed frame is done.
+        with self.assertRaises(IOError):
+            self.transmitter.write(b'2')
+            self.transmitter.write(b'3')
+
+    def test_close(self):
+        self.spi.release.clear()
+        self.transmitter.write(b'1')
+        self.transmitter.write(b'2')
+        self.spi.release.set()
+        self.transmitter.close()
+        self.assertEqual(self.spi.writes, [b'1', b'2'])
+        self.assertRaises(ValueError, self.transmitter.write, b'3')
+
+    def test_close_raises_error(self):
+        self.spi.fail = True
+        self.transmitter.write(b'1')
+        self.assertRaises(IOError, self.transmitter.close)
+
+    def test_threaded_strip(self):
+        chains = [SimulatedChain(8), SimulatedChain(12)]
+        strip = APA102(20, segments=[(8, chains[0]), (12, chains[1])], threaded=True)
+        self.addCleanup(strip.cleanup)
+        for seed in range(4):
+            strip[:] = colors(20, seed)
+            strip[seed] = Pixel.WHITE
+            strip.show()
+        strip.flush()
+        for chain, start in zip(chains, (0, 8)):
+            for i, cmd in enumerate(chain.latched):
+                self.assertEqual(cmd, strip.pixel_cmd.to_cmd(strip[start + i]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for the colour cycle template.
+
+Run with: python3 -m pytest test_colorcycletemplate.py
+"""
+import unittest
+from unittest import mock
+
+import apa102
+from colorcycletemplate import ColorCycleTemplate, merge_repaint
+from test_apa102 import SimulatedChain
+
+
+class TestMergeRepaint(unittest.TestCase):
+
+    def test_nothing_to_repaint(self):
+        self.assertEqual(merge_repaint([0, None, False]), 0)
+
+    def test_ranges_are_merged(self):
+        self.assertEqual(merge_repaint([(4, 6), 0, (1, 2)]), (1, 6))
+
+    def test_full_repaint_wins(self):
+        self.assertEqual(merge_repaint([(4, 6), 1, (1, 2)]), 1)
+
+    def test_every_updater_is_called(self):
+        called = []
+
+        def updater(name, result):
+            def update():
+                called.append(name)
+                return result
+            return update
+
+        # A full repaint first must not stop the updaters after it
+        updaters = [updater('rainbow', 1), updater('swipe', (3, 5)), updater('idle', 0)]
+        self.assertEqual(merge_repaint(update() for update in updaters), 1)
+        self.assertEqual(called, ['rainbow', 'swipe', 'idle'])
+
+
+class RecordingStrip(apa102.APA102):
+    """A strip on a simulated chain that records the arguments of show()."""
+
+    def __init__(self, num_led, **kwargs):
+        self.chain = SimulatedChain(num_led)
+        self.shown = []
+        super().__init__(num_led, global_brightness=kwargs['global_brightness'],
+                         order=kwargs['order'], segments=[(num_led, self.chain)])
+
+    def show(self, dirty=None, force=False):
+        super().show(dirty, force)
+        latched = [self.pixel_cmd.to_cmd(self[i]) for i in range(self.num_led)]
+        self.shown.append((dirty, self.chain.latched == latched))
+
+
+class TestColorCycleTemplate(unittest.TestCase):
+
+    def run_cycle(self, *updaters):
+        strips = []
+
+        def create_strip(**kwargs):
+            strips.append(RecordingStrip(**kwargs))
+            return strips[-1]
+
+        cycle = ColorCycleTemplate(num_led=10, num_steps_per_cycle=3, num_cycles=1)
+        for updater in updaters:
+            cycle.append_updater(updater)
+        with mock.patch.object(apa102, 'APA102', create_strip):
+            cycle.start()
+        return strips[0].shown
+
+    def test_dirty_ranges(self):
+        def paint(strip, num_led, num_steps_per_cycle, current_step, current_cycle):
+            strip[2 * current_step] = apa102.Pixel.RED
+            return (2 * current_step, 2 * current_step)
+
+        def idle(strip, num_led, num_steps_per_cycle, current_step, current_cycle):
+            if current_step != 1:
+                return 0
+            strip[7] = apa102.Pixel.BLUE
+            return (7, 7)
+
+        shown = self.run_cycle(paint, idle)
+        # clear_strip() and the show() after init() come first, clear_strip()
+        # at the end repaints everything.
+        self.assertEqual(shown, [(None, True), (None, True), ((0, 0), True),
+                                 ((2, 7), True), ((4, 4), True), (None, True)])
+
+    def test_nothing_to_repaint(self):
+        def idle(strip, num_led, num_steps_per_cycle, current_step, current_cycle):
+            return 0
+
+        self.assertEqual(len(self.run_cycle(idle)), 3)
+
+    def test_full_repaint(self):
+        def rainbow(strip, num_led, num_steps_per_cycle, current_step, current_cycle):
+            strip.fill(0, num_led - 1, (current_step, 0, 0))
+            return 1
+
+        def swipe(strip, num_led, num_steps_per_cycle, current_step, current_cycle):
+            strip[current_step] = apa102.Pixel.GREEN
+            return (current_step, current_step)
+
+        shown = self.run_cycle(rainbow, swipe)
+        self.assertEqual(shown[2:5], [(None, True)] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
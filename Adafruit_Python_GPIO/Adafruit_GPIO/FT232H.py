@@ -20,6 +20,7 @@
 # THE SOFTWARE.
 
 import atexit
+import contextlib
 import logging
 import math
 import os
@@ -42,6 +43,12 @@ LSBFIRST = 1
 
 _REPEAT_DELAY = 4
 
+# Reads that find no data are retried right away this many times, then with a
+# delay that doubles from _READ_MIN_DELAY up to _READ_MAX_DELAY seconds.
+_READ_RETRIES   = 10
+_READ_MIN_DELAY = 0.0001
+_READ_MAX_DELAY = 0.01
+
 
 def _check_running_as_root():
     # NOTE: Checking for root with user ID 0 isn't very portable, perhaps
@@ -124,6 +131,15 @@ def enumerate_device_serials(vid=FT232H_VID, pid=FT232H_PID):
             ftdi.free(ctx)
 
 
+class PendingRead(object):
+    """The answer of an MPSSE command queued with FT232H.queue_read().  Data
+    is None until FT232H.collect_reads() has been called.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.data = None
+
+
 class FT232H(GPIO.BaseGPIO):
     # Make GPIO constants that match main GPIO class for compatibility.
     HIGH = GPIO.HIGH
@@ -131,13 +147,17 @@ class FT232H(GPIO.BaseGPIO):
     IN   = GPIO.IN
     OUT  = GPIO.OUT
 
-    def __init__(self, vid=FT232H_VID, pid=FT232H_PID, serial=None):
+    def __init__(self, vid=FT232H_VID, pid=FT232H_PID, serial=None, latency_ms=1,
+                 read_timeout_s=5.0):
         """Create a FT232H object.  Will search for the first available FT232H
         device with the specified USB vendor ID and product ID (defaults to
         FT232H default VID & PID).  Can also specify an optional serial number
         string to open an explicit FT232H device given its serial number.  See
         the FT232H.enumerate_device_serials() function to see how to list all
-        connected device serial numbers.
+        connected device serial numbers.  Latency_ms sets the FTDI latency
+        timer (1-255 milliseconds), the longest time the chip holds back read
+        data before sending it over USB.  Read_timeout_s is the time after
+        which a read that gets no answer fails.
         """
         # Initialize FTDI device connection.
         self._ctx = ftdi.new()
@@ -158,13 +178,21 @@ class FT232H(GPIO.BaseGPIO):
         # Change read & write buffers to maximum size, 65535 bytes.
         self._check(ftdi.read_data_set_chunksize, 65535)
         self._check(ftdi.write_data_set_chunksize, 65535)
+        # Send short answers (like I2C ACKs) right away instead of after 16ms.
+        self._check(ftdi.set_latency_timer, latency_ms)
+        self.read_timeout_s = read_timeout_s
+        # Reads queued with queue_read() that wait for collect_reads().
+        self._pending_reads = []
         # Clear pending read data & write buffers.
         self._check(ftdi.usb_purge_buffers)
+        # MPSSE commands are collected here and sent with a single USB write.
+        self._queue = bytearray()
+        self._batch_depth = 0
         # Enable MPSSE and syncronize communication with device.
         self._mpsse_enable()
         self._mpsse_sync()
         # Initialize all GPIO as inputs.
-        self._write('\x80\x00\x00\x82\x00\x00')
+        self._write(b'\x80\x00\x00\x82\x00\x00')
         self._direction = 0x0000
         self._level = 0x0000
 
@@ -174,10 +202,23 @@ class FT232H(GPIO.BaseGPIO):
             ftdi.free(self._ctx)
         self._ctx = None
 
-    def _write(self, string):
-        """Helper function to call write_data on the provided FTDI device and
-        verify it succeeds.
+    def _write(self, string, flush=True):
+        """Helper function to queue MPSSE commands for the FTDI device.  The
+        queue is sent right away unless flush is False or a batch is active,
+        see batch().
         """
+        self._queue += string
+        if flush and not self._batch_depth:
+            self.flush()
+
+    def flush(self):
+        """Send all queued MPSSE commands to the FTDI device with one call to
+        write_data and verify it succeeds.
+        """
+        if not self._queue:
+            return
+        string = bytes(self._queue)
+        del self._queue[:]
         # Get modem status. Useful to enable for debugging.
         #ret, status = ftdi.poll_modem_status(self._ctx)
         #if ret == 0:
@@ -194,6 +235,26 @@ class FT232H(GPIO.BaseGPIO):
         if ret != length:
             raise RuntimeError('ftdi_write_data expected to write {0} bytes but actually wrote {1}!'.format(length, ret))
 
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager that queues all MPSSE commands issued within it
+        (pin changes, SPI and I2C transfers) and sends them with a single USB
+        write when it ends.  Reads send the queued commands early, because
+        their answer depends on them.  Batches can be nested, only the
+        outermost one sends the queue.
+
+            with ft232h.batch():
+                ft232h.output(8, GPIO.HIGH)
+                ft232h.output(9, GPIO.LOW)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
     def _check(self, command, *args):
         """Helper function to call the provided command on the FTDI device and
         verify the response matches the expected value.
@@ -203,18 +264,28 @@ class FT232H(GPIO.BaseGPIO):
         if ret != 0:
             raise RuntimeError('ftdi_{0} failed with error {1}: {2}'.format(command.__name__, ret, ftdi.get_error_string(self._ctx)))
 
-    def _poll_read(self, expected, timeout_s=5.0):
+    def _poll_read(self, expected, timeout_s=None):
         """Helper function to continuously poll reads on the FTDI device until an
         expected number of bytes are returned.  Will throw a timeout error if no
-        data is received within the specified number of timeout seconds.  Returns
-        the read data as a string if successful, otherwise raises an execption.
+        data is received within the specified number of timeout seconds (by
+        default read_timeout_s).  Returns the read data as bytes if successful,
+        otherwise raises an execption.
         """
+        if timeout_s is None:
+            timeout_s = self.read_timeout_s
+        # Answers to queued reads arrive first, collect them.
+        if self._pending_reads:
+            self.collect_reads()
+        # Make sure the commands that produce the response have been sent.
+        self.flush()
         start = time.time()
         # Start with an empty response buffer.
         response = bytearray(expected)
         index = 0
+        retries = 0
+        delay = _READ_MIN_DELAY
         # Loop calling read until the response buffer is full or a timeout occurs.
-        while time.time() - start <= timeout_s:
+        while True:
             ret, data = ftdi.read_data(self._ctx, expected - index)
             # Fail if there was an error reading data.
             if ret < 0:
@@ -224,10 +295,57 @@ class FT232H(GPIO.BaseGPIO):
             index += ret
             # Buffer is full, return the result data.
             if index >= expected:
-                return str(response)
-            time.sleep(0.01)
+                return bytes(response)
+            if time.time() - start > timeout_s:
+                break
+            # The answer is usually less than a USB frame away, so retry right
+            # away first and only then back off.  Data arriving means more is
+            # on its way, so start over without delay.
+            if ret > 0:
+                retries = 0
+                delay = _READ_MIN_DELAY
+            elif retries < _READ_RETRIES:
+                retries += 1
+            else:
+                time.sleep(delay)
+                delay = min(delay * 2, _READ_MAX_DELAY)
         raise RuntimeError('Timeout while polling ftdi_read_data for {0} bytes!'.format(expected))
 
+    def queue_read(self, command, length):
+        """Queue an MPSSE command that answers with length bytes, without
+        waiting for the answer.  Several reads can be queued this way and
+        their answers are fetched together by collect_reads(), so they cost a
+        single USB round trip.  Returns a PendingRead whose data attribute is
+        set by collect_reads().
+        """
+        self._write(command, flush=False)
+        pending = PendingRead(length)
+        self._pending_reads.append(pending)
+        return pending
+
+    def collect_reads(self):
+        """Send all queued commands and read the answers of the reads queued
+        with queue_read() in one go.  Returns a list with the data of each of
+        them, in the order they were queued.
+        """
+        pending, self._pending_reads = self._pending_reads, []
+        if not pending:
+            return []
+        # Ask the MPSSE to send the answers back immediately.
+        self._write(b'\x87', flush=False)
+        data = self._poll_read(sum(read.length for read in pending))
+        offset = 0
+        for read in pending:
+            read.data = data[offset:offset + read.length]
+            offset += read.length
+        return [read.data for read in pending]
+
+    def set_latency_timer(self, latency_ms):
+        """Set the FTDI latency timer, the longest time in milliseconds (1-255)
+        the chip holds back read data before sending it over USB.
+        """
+        self._check(ftdi.set_latency_timer, latency_ms)
+
     def _mpsse_enable(self):
         """Enable MPSSE mode on the FTDI device."""
         # Reset MPSSE by sending mask = 0 and mode = 0
@@ -240,14 +358,14 @@ class FT232H(GPIO.BaseGPIO):
         error response.  Should be called once after enabling MPSSE."""
         # Send a bad/unknown command (0xAB), then read buffer until bad command
         # response is found.
-        self._write('\xAB')
+        self._write(b'\xAB')
         # Keep reading until bad command response (0xFA 0xAB) is returned.
         # Fail if too many read attempts are made to prevent sticking in a loop.
         tries = 0
         sync = False
         while not sync:
             data = self._poll_read(2)
-            if data == '\xFA\xAB':
+            if data == b'\xFA\xAB':
                 sync = True
             tries += 1
             if tries >= max_retries:
@@ -256,44 +374,46 @@ class FT232H(GPIO.BaseGPIO):
     def mpsse_set_clock(self, clock_hz, adaptive=False, three_phase=False):
         """Set the clock speed of the MPSSE engine.  Can be any value from 450hz
         to 30mhz and will pick that speed or the closest speed below it.
+        Faster speeds are limited to 30mhz.
         """
         # Disable clock divisor by 5 to enable faster speeds on FT232H.
-        self._write('\x8A')
+        self._write(b'\x8A', flush=False)
         # Turn on/off adaptive clocking.
         if adaptive:
-            self._write('\x96')
+            self._write(b'\x96', flush=False)
         else:
-            self._write('\x97')
+            self._write(b'\x97', flush=False)
         # Turn on/off three phase clock (needed for I2C).
         # Also adjust the frequency for three-phase clocking as specified in section 2.2.4
         # of this document:
         #   http://www.ftdichip.com/Support/Documents/AppNotes/AN_255_USB%20to%20I2C%20Example%20using%20the%20FT232H%20and%20FT201X%20devices.pdf
         if three_phase:
-            self._write('\x8C')
+            self._write(b'\x8C', flush=False)
         else:
-            self._write('\x8D')
+            self._write(b'\x8D', flush=False)
         # Compute divisor for requested clock.
         # Use equation from section 3.8.1 of:
         #  http://www.ftdichip.com/Support/Documents/AppNotes/AN_108_Command_Processor_for_MPSSE_and_MCU_Host_Bus_Emulation_Modes.pdf
         # Note equation is using 60mhz master clock instead of 12mhz.
-        divisor = int(math.ceil((30000000.0-float(clock_hz))/float(clock_hz))) & 0xFFFF
+        clock_hz = min(clock_hz, 30000000)
+        divisor = min(int(math.ceil((30000000.0-float(clock_hz))/float(clock_hz))), 0xFFFF)
         if three_phase:
             divisor = int(divisor*(2.0/3.0))
         logger.debug('Setting clockspeed with divisor value {0}'.format(divisor))
         # Send command to set divisor from low and high byte values.
-        self._write(str(bytearray((0x86, divisor & 0xFF, (divisor >> 8) & 0xFF))))
+        self._write(bytes(bytearray((0x86, divisor & 0xFF, (divisor >> 8) & 0xFF))))
 
     def mpsse_read_gpio(self):
         """Read both GPIO bus states and return a 16 bit value with their state.
         D0-D7 are the lower 8 bits and C0-C7 are the upper 8 bits.
         """
-        # Send command to read low byte and high byte.
-        self._write('\x81\x83')
+        # Send command to read low byte and high byte (the read sends it).
+        self._write(b'\x81\x83', flush=False)
         # Wait for 2 byte response.
-        data = self._poll_read(2)
+        data = bytearray(self._poll_read(2))
         # Assemble response into 16 bit value.
-        low_byte = ord(data[0])
-        high_byte = ord(data[1])
+        low_byte = data[0]
+        high_byte = data[1]
         logger.debug('Read MPSSE GPIO low byte = {0:02X} and high byte = {1:02X}'.format(low_byte, high_byte))
         return (high_byte << 8) | low_byte
 
@@ -301,11 +421,11 @@ class FT232H(GPIO.BaseGPIO):
         """Return command to update the MPSSE GPIO state to the current direction
         and level.
         """
-        level_low  = chr(self._level & 0xFF)
-        level_high = chr((self._level >> 8) & 0xFF)
-        dir_low  = chr(self._direction & 0xFF)
-        dir_high = chr((self._direction >> 8) & 0xFF)
-        return str(bytearray((0x80, level_low, dir_low, 0x82, level_high, dir_high)))
+        level_low  = self._level & 0xFF
+        level_high = (self._level >> 8) & 0xFF
+        dir_low  = self._direction & 0xFF
+        dir_high = (self._direction >> 8) & 0xFF
+        return bytes(bytearray((0x80, level_low, dir_low, 0x82, level_high, dir_high)))
 
     def mpsse_write_gpio(self):
         """Write the current MPSSE GPIO state to the FT232H chip."""
@@ -465,23 +585,34 @@ class SPI(object):
 
     def write(self, data):
         """Half-duplex SPI write.  The specified array of bytes will be clocked
-        out the MOSI line.
+        out the MOSI line.  Data can be a list of byte values or a bytes,
+        bytearray or memoryview object, which is used without conversion.
+        Any length is supported.
         """
         # Build command to write SPI data.
         command = 0x10 | (self.lsbfirst << 3) | self.write_clock_ve
         logger.debug('SPI write with command {0:2X}.'.format(command))
-        # Compute length low and high bytes.
-        # NOTE: Must actually send length minus one because the MPSSE engine
-        # considers 0 a length of 1 and FFFF a length of 65536
-        length = len(data)-1
-        len_low  = length & 0xFF
-        len_high = (length >> 8) & 0xFF
-        self._assert_cs()
-        # Send command and length.
-        self._ft232h._write(str(bytearray((command, len_low, len_high))))
-        # Send data.
-        self._ft232h._write(str(bytearray(data)))
-        self._deassert_cs()
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytearray(data)
+        data = memoryview(data)
+        # Send CS assert, command, length, data and CS deassert in one USB write.
+        with self._ft232h.batch():
+            self._assert_cs()
+            # One command sends at most 65536 bytes, so longer data is split
+            # into commands that follow each other directly.
+            for start in range(0, len(data), 65536):
+                chunk = data[start:start + 65536]
+                # Compute length low and high bytes.
+                # NOTE: Must actually send length minus one because the MPSSE engine
+                # considers 0 a length of 1 and FFFF a length of 65536
+                length = len(chunk)-1
+                len_low  = length & 0xFF
+                len_high = (length >> 8) & 0xFF
+                # Send command and length.
+                self._ft232h._write(bytes(bytearray((command, len_low, len_high))))
+                # Send data.
+                self._ft232h._write(chunk)
+            self._deassert_cs()
 
     def read(self, length):
         """Half-duplex SPI read.  The specified length of bytes will be clocked
@@ -495,10 +626,11 @@ class SPI(object):
         # considers 0 a length of 1 and FFFF a length of 65536
         len_low  = (length-1) & 0xFF
         len_high = ((length-1) >> 8) & 0xFF
-        self._assert_cs()
-        # Send command and length.
-        self._ft232h._write(str(bytearray((command, len_low, len_high, 0x87))))
-        self._deassert_cs()
+        with self._ft232h.batch():
+            self._assert_cs()
+            # Send command and length.
+            self._ft232h._write(bytes(bytearray((command, len_low, len_high, 0x87))))
+            self._deassert_cs()
         # Read response bytes.
         return bytearray(self._ft232h._poll_read(length))
 
@@ -517,14 +649,19 @@ class SPI(object):
         len_low  = (length-1) & 0xFF
         len_high = ((length-1) >> 8) & 0xFF
         # Send command and length.
-        self._assert_cs()
-        self._ft232h._write(str(bytearray((command, len_low, len_high))))
-        self._ft232h._write(str(bytearray(data)))
-        self._ft232h._write('\x87')
-        self._deassert_cs()
+        with self._ft232h.batch():
+            self._assert_cs()
+            self._ft232h._write(bytes(bytearray((command, len_low, len_high))))
+            self._ft232h._write(bytes(bytearray(data)))
+            self._ft232h._write(b'\x87')
+            self._deassert_cs()
         # Read response bytes.
         return bytearray(self._ft232h._poll_read(length))
 
+    def close(self):
+        """Close the SPI connection.  The FT232H itself stays open."""
+        pass
+
 
 class I2CDevice(object):
     """Class for communicating with an I2C device using the smbus library.
@@ -542,14 +679,18 @@ class I2CDevice(object):
         # Enable drive-zero mode to drive outputs low on 0 and tri-state on 1.
         # This matches the protocol for I2C communication so multiple devices can
         # share the I2C bus.
-        self._ft232h._write('\x9E\x07\x00')
+        self._ft232h._write(b'\x9E\x07\x00', flush=False)
         self._idle()
+        self._ft232h.flush()
 
     def _idle(self):
-        """Put I2C lines into idle state."""
+        """Put I2C lines into idle state.  The command is queued and goes out
+        with the following transaction.
+        """
         # Put the I2C lines into an idle state with SCL and SDA high.
         self._ft232h.setup_pins({0: GPIO.OUT, 1: GPIO.OUT, 2: GPIO.IN},
-                                {0: GPIO.HIGH, 1: GPIO.HIGH})
+                                {0: GPIO.HIGH, 1: GPIO.HIGH}, write=False)
+        self._ft232h._write(self._ft232h.mpsse_gpio(), flush=False)
 
     def _transaction_start(self):
         """Start I2C transaction."""
@@ -560,9 +701,9 @@ class I2CDevice(object):
     def _transaction_end(self):
         """End I2C transaction and get response bytes, including ACKs."""
         # Ask to return response bytes immediately.
-        self._command.append('\x87')
+        self._command.append(b'\x87')
         # Send the entire command to the MPSSE.
-        self._ft232h._write(''.join(self._command))
+        self._ft232h._write(b''.join(self._command))
         # Read response bytes and return them.
         return bytearray(self._ft232h._poll_read(self._expected))
 
@@ -603,12 +744,12 @@ class I2CDevice(object):
         """
         for i in range(length-1):
             # Read a byte and send ACK.
-            self._command.append('\x20\x00\x00\x13\x00\x00')
+            self._command.append(b'\x20\x00\x00\x13\x00\x00')
             # Make sure pins are back in idle state with clock low and data high.
             self._ft232h.output_pins({0: GPIO.LOW, 1: GPIO.HIGH}, write=False)
             self._command.append(self._ft232h.mpsse_gpio())
         # Read last byte and send NAK.
-        self._command.append('\x20\x00\x00\x13\x00\xFF')
+        self._command.append(b'\x20\x00\x00\x13\x00\xFF')
         # Make sure pins are back in idle state with clock low and data high.
         self._ft232h.output_pins({0: GPIO.LOW, 1: GPIO.HIGH}, write=False)
         self._command.append(self._ft232h.mpsse_gpio())
@@ -619,12 +760,12 @@ class I2CDevice(object):
         """Write the specified number of bytes to the chip."""
         for byte in data:
             # Write byte.
-            self._command.append(str(bytearray((0x11, 0x00, 0x00, byte))))
+            self._command.append(bytes(bytearray((0x11, 0x00, 0x00, byte))))
             # Make sure pins are back in idle state with clock low and data high.
             self._ft232h.output_pins({0: GPIO.LOW, 1: GPIO.HIGH}, write=False)
             self._command.append(self._ft232h.mpsse_gpio() * _REPEAT_DELAY)
             # Read bit for ACK/NAK.
-            self._command.append('\x22\x00')
+            self._command.append(b'\x22\x00')
         # Increase expected response bytes.
         self._expected += len(data)
 
@@ -814,3 +955,131 @@ class I2CDevice(object):
         """Read a signed 16-bit value from the specified register, in big
         endian byte order."""
         return self.readS16(register, little_endian=False)
+
+
+class I2CTransaction(object):
+    """Queue register reads and writes for one or more I2C devices on the same
+    FT232H and run them all with a single USB round trip.  Operations take the
+    I2CDevice they address as first parameter, execute() sends the queued
+    commands, checks all ACKs in one response and returns the values of the
+    read operations in the order they were queued.  For example:
+
+        transaction = I2CTransaction(ft232h)
+        transaction.readU16(light_sensor, 0x0C)
+        transaction.readS8(temp_sensor, 0x00)
+        transaction.write8(temp_sensor, 0x01, 0x60)
+        light, temp = transaction.execute()
+
+    The bus runs at the clock set by the most recently created I2CDevice.
+    """
+    def __init__(self, ft232h):
+        self._ft232h = ft232h
+        self._operations = []
+
+    def _queue(self, device, build, length=0, convert=None):
+        # Reuse the device's command builders, then take the result over.
+        device._transaction_start()
+        build(device)
+        self._operations.append((device, b''.join(device._command),
+                                 device._expected, length, convert))
+
+    def _queue_write(self, device, data):
+        def build(device):
+            device._i2c_start()
+            device._i2c_write_bytes([device._address_byte(False)] + data)
+            device._i2c_stop()
+        self._queue(device, build)
+
+    def _queue_read(self, device, register, length, convert):
+        def build(device):
+            device._i2c_start()
+            device._i2c_write_bytes([device._address_byte(False), register])
+            device._i2c_stop()
+            device._i2c_idle()
+            device._i2c_start()
+            device._i2c_write_bytes([device._address_byte(True)])
+            device._i2c_read_bytes(length)
+            device._i2c_stop()
+        self._queue(device, build, length, convert)
+
+    def write8(self, device, register, value):
+        """Queue writing an 8-bit value to the specified register."""
+        self._queue_write(device, [register, value & 0xFF])
+
+    def write16(self, device, register, value, little_endian=True):
+        """Queue writing a 16-bit value to the specified register."""
+        value = value & 0xFFFF
+        value_low  = value & 0xFF
+        value_high = (value >> 8) & 0xFF
+        if not little_endian:
+            value_low, value_high = value_high, value_low
+        self._queue_write(device, [register, value_low, value_high])
+
+    def writeList(self, device, register, data):
+        """Queue writing bytes to the specified register."""
+        self._queue_write(device, [register] + list(data))
+
+    def readList(self, device, register, length):
+        """Queue reading a length number of bytes from the specified register.
+        The result will be a bytearray."""
+        if length <= 0:
+            raise ValueError("Length must be at least 1 byte.")
+        self._queue_read(device, register, length, bytearray)
+
+    def readU8(self, device, register):
+        """Queue reading an unsigned byte from the specified register."""
+        self._queue_read(device, register, 1, lambda data: data[0])
+
+    def readS8(self, device, register):
+        """Queue reading a signed byte from the specified register."""
+        def convert(data):
+            result = data[0]
+            if result > 127:
+                result -= 256
+            return result
+        self._queue_read(device, register, 1, convert)
+
+    def readU16(self, device, register, little_endian=True):
+        """Queue reading an unsigned 16-bit value from the specified register,
+        with the specified endianness (default little endian)."""
+        def convert(data):
+            if little_endian:
+                return (data[1] << 8) | data[0]
+            else:
+                return (data[0] << 8) | data[1]
+        self._queue_read(device, register, 2, convert)
+
+    def readS16(self, device, register, little_endian=True):
+        """Queue reading a signed 16-bit value from the specified register,
+        with the specified endianness (default little endian)."""
+        def convert(data):
+            if little_endian:
+                result = (data[1] << 8) | data[0]
+            else:
+                result = (data[0] << 8) | data[1]
+            if result > 32767:
+                result -= 65536
+            return result
+        self._queue_read(device, register, 2, convert)
+
+    def execute(self):
+        """Send all queued operations in one command stream, verify the ACKs
+        and return a list with the values of the read operations.  Raises a
+        RuntimeError if any device did not acknowledge.  The transaction is
+        empty afterwards and can be filled and executed again.
+        """
+        operations, self._operations = self._operations, []
+        if not operations:
+            return []
+        # All devices share the bus lines, so putting them idle once is enough.
+        operations[0][0]._idle()
+        pending = [self._ft232h.queue_read(command, expected)
+                   for _, command, expected, _, _ in operations]
+        self._ft232h.collect_reads()
+        results = []
+        for (device, _, expected, length, convert), read in zip(operations, pending):
+            response = bytearray(read.data)
+            device._verify_acks(response[:expected - length])
+            if convert is not None:
+                results.append(convert(response[expected - length:]))
+        return results
@@ -19,6 +19,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import mmap
+import os
+import struct
+import time
+
 import Adafruit_GPIO.Platform as Platform
 
 
@@ -105,6 +110,16 @@ class BaseGPIO(object):
         # General implementation that can be optimized by derived classes.
         return [self.input(pin) for pin in pins]
 
+    def output_sequence(self, pins, values):
+        """Write a sequence of outputs in the given order.  Pins and values
+        are lists of equal length, values[i] (HIGH/True or LOW/False) is written
+        to pins[i].  Unlike output_pins the same pin can appear many times,
+        which makes it suitable for bit banging a protocol.
+        """
+        # General implementation that can be optimized by derived classes.
+        for pin, value in zip(pins, values):
+            self.output(pin, value)
+
 
     def add_event_detect(self, pin, edge):
         """Enable edge detection events for a particular GPIO channel.  Pin 
@@ -193,6 +208,14 @@ class RPiGPIOAdapter(BaseGPIO):
         """
         self.rpi_gpio.output(pin, value)
 
+    def output_sequence(self, pins, values):
+        """Write a sequence of outputs in the given order.  Pins and values
+        are lists of equal length, values[i] (HIGH/True or LOW/False) is written
+        to pins[i].
+        """
+        # RPi.GPIO writes lists of channels and values in order in one call.
+        self.rpi_gpio.output(list(pins), list(values))
+
     def input(self, pin):
         """Read the specified pin and return HIGH/true if the pin is pulled high,
         or LOW/false if pulled low.
@@ -253,6 +276,155 @@ class RPiGPIOAdapter(BaseGPIO):
         else:
             self.rpi_gpio.cleanup(pin)
 
+class RPiGPIOMemAdapter(BaseGPIO):
+    """GPIO implementation for the Raspberry Pi that maps the GPIO registers
+    into memory (through /dev/gpiomem by default) and sets and clears pins by
+    writing the SET and CLR registers directly.  This is much faster than
+    going through RPi.GPIO, which makes it a good fit for bit banging.  Pins
+    use BCM numbering.  Edge detection is not supported.
+    """
+
+    NUM_GPIO = 54
+
+    # Register offsets of the BCM283x GPIO block.
+    GPFSEL0   = 0x00
+    GPSET0    = 0x1C
+    GPCLR0    = 0x28
+    GPLEV0    = 0x34
+    GPPUD     = 0x94
+    GPPUDCLK0 = 0x98
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, path='/dev/gpiomem'):
+        """Map the GPIO registers from the file at path.  Any file of at least
+        BLOCK_SIZE bytes works, which is useful for testing.
+        """
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mem = mmap.mmap(fd, self.BLOCK_SIZE)
+        finally:
+            os.close(fd)
+        self._pud_mapping = { PUD_OFF:  0,
+                              PUD_DOWN: 1,
+                              PUD_UP:   2 }
+
+    def _read_register(self, offset):
+        return struct.unpack_from('<I', self._mem, offset)[0]
+
+    def _write_register(self, offset, value):
+        struct.pack_into('<I', self._mem, offset, value)
+
+    def setup(self, pin, mode, pull_up_down=PUD_OFF):
+        """Set the input or output mode for a specified pin.  Mode should be
+        either OUT or IN.  Pull ups and downs use the GPPUD sequence of the
+        BCM2835/6/7 (Pi 3 and older).
+        """
+        self._validate_pin(pin)
+        # Each GPFSEL register holds the 3 bit function of 10 pins.
+        offset = self.GPFSEL0 + 4 * (pin // 10)
+        shift = 3 * (pin % 10)
+        value = self._read_register(offset) & ~(0b111 << shift)
+        if mode == OUT:
+            value |= 0b001 << shift
+        self._write_register(offset, value)
+        self._write_register(self.GPPUD, self._pud_mapping[pull_up_down])
+        # The control signal needs 150 cycles to set up and hold.
+        time.sleep(0.00001)
+        self._write_register(self.GPPUDCLK0 + 4 * (pin // 32), 1 << (pin % 32))
+        time.sleep(0.00001)
+        self._write_register(self.GPPUD, 0)
+        self._write_register(self.GPPUDCLK0 + 4 * (pin // 32), 0)
+
+    def output(self, pin, value):
+        """Set the specified pin the provided high/low value.  Value should be
+        either HIGH/LOW or a boolean (true = high).
+        """
+        base = self.GPSET0 if value else self.GPCLR0
+        self._write_register(base + 4 * (pin // 32), 1 << (pin % 32))
+
+    def input(self, pin):
+        """Read the specified pin and return HIGH/true if the pin is pulled high,
+        or LOW/false if pulled low.
+        """
+        return self._read_register(self.GPLEV0 + 4 * (pin // 32)) & (1 << (pin % 32)) != 0
+
+    def output_pins(self, pins):
+        """Set multiple pins high or low at once.  Pins should be a dict of pin
+        name to pin value (HIGH/True for 1, LOW/False for 0).  All provided pins
+        will be set to the given values.
+        """
+        # Collect the pins of each bank into one SET and one CLR write.
+        masks = {}
+        for pin, value in iter(pins.items()):
+            base = self.GPSET0 if value else self.GPCLR0
+            offset = base + 4 * (pin // 32)
+            masks[offset] = masks.get(offset, 0) | (1 << (pin % 32))
+        for offset, mask in iter(masks.items()):
+            self._write_register(offset, mask)
+
+    def input_pins(self, pins):
+        """Read multiple pins specified in the given list and return list of pin values
+        GPIO.HIGH/True if the pin is pulled high, or GPIO.LOW/False if pulled low.
+        """
+        levels = [self._read_register(self.GPLEV0), self._read_register(self.GPLEV0 + 4)]
+        return [levels[pin // 32] & (1 << (pin % 32)) != 0 for pin in pins]
+
+    def write_bits(self, bits, data_pin, clock_pin, clock_base=LOW):
+        """Clock out a sequence of bits (true for 1, false for 0).  For each
+        bit, it is written to data_pin, then clock_pin is flipped from
+        clock_base and back.
+        """
+        write = self._write_register
+        data_mask = 1 << (data_pin % 32)
+        clock_mask = 1 << (clock_pin % 32)
+        data_set = self.GPSET0 + 4 * (data_pin // 32)
+        data_clear = self.GPCLR0 + 4 * (data_pin // 32)
+        clock_set = self.GPSET0 + 4 * (clock_pin // 32)
+        clock_clear = self.GPCLR0 + 4 * (clock_pin // 32)
+        clock_off, clock_on = (clock_clear, clock_set) if clock_base else (clock_set, clock_clear)
+        for bit in bits:
+            write(data_set if bit else data_clear, data_mask)
+            write(clock_off, clock_mask)
+            write(clock_on, clock_mask)
+
+    def transfer_bits(self, bits, data_pin, input_pin, clock_pin, clock_base=LOW,
+                      read_leading=True):
+        """Clock out one bit for each entry of bits and sample input_pin.
+        Each bit is written to data_pin first (unless data_pin is None), then
+        clock_pin is flipped from clock_base and back.  input_pin is sampled
+        after the leading edge if read_leading is true, otherwise after the
+        trailing edge.  Returns a list with 1 for every high and 0 for every
+        low sample.
+        """
+        write = self._write_register
+        read = self._read_register
+        data_mask = 1 << (data_pin % 32) if data_pin is not None else 0
+        data_set = self.GPSET0 + 4 * ((data_pin or 0) // 32)
+        data_clear = self.GPCLR0 + 4 * ((data_pin or 0) // 32)
+        clock_mask = 1 << (clock_pin % 32)
+        clock_set = self.GPSET0 + 4 * (clock_pin // 32)
+        clock_clear = self.GPCLR0 + 4 * (clock_pin // 32)
+        clock_off, clock_on = (clock_clear, clock_set) if clock_base else (clock_set, clock_clear)
+        level = self.GPLEV0 + 4 * (input_pin // 32)
+        shift = input_pin % 32
+        samples = [0] * len(bits)
+        for i, bit in enumerate(bits):
+            if data_mask:
+                write(data_set if bit else data_clear, data_mask)
+            write(clock_off, clock_mask)
+            if read_leading:
+                samples[i] = read(level) >> shift & 1
+            write(clock_on, clock_mask)
+            if not read_leading:
+                samples[i] = read(level) >> shift & 1
+        return samples
+
+    def cleanup(self, pin=None):
+        """Unmap the GPIO registers.  Pins keep their current state."""
+        if pin is None:
+            self._mem.close()
+
 class AdafruitBBIOAdapter(BaseGPIO):
     """GPIO implementation for the Beaglebone Black using the Adafruit_BBIO
     library.
@@ -102,6 +102,61 @@ class Device(object):
             self._bus = i2c_interface(busnum)
         self._logger = logging.getLogger('Adafruit_I2C.Device.Bus.{0}.Address.{1:#0X}' \
                                 .format(busnum, address))
+        # Register windows served from the cache, see cache_registers().
+        self._windows = []
+        self._cache = {}
+
+    def cache_registers(self, start, length):
+        """Serve reads of the length registers from start on from a cache.  The
+        first read of a register in the window fetches the whole window with
+        one block read, later reads come from memory until invalidate_cache()
+        is called (typically once per polling tick) or the register is
+        written.  For example:
+
+            device.cache_registers(0x00, 8)
+            while True:
+                device.invalidate_cache()
+                temp = device.readS16(0x00)  # Reads registers 0x00-0x07.
+                light = device.readU16(0x04)  # No bus transaction.
+        """
+        self._windows.append((start, length))
+
+    def invalidate_cache(self):
+        """Drop all cached register values, the next reads go to the device."""
+        self._cache.clear()
+
+    def read_block(self, start, length):
+        """Read length registers from start on with as few block reads as
+        possible and store them in the cache.  Results will be returned as a
+        bytearray."""
+        results = bytearray()
+        while len(results) < length:
+            # SMBus block reads return at most 32 bytes.
+            count = min(length - len(results), 32)
+            results.extend(self._bus.read_i2c_block_data(self._address,
+                                                         start + len(results), count))
+        for i, value in enumerate(results):
+            self._cache[start + i] = value
+        self._logger.debug("Read block from register 0x%02X: %s",
+                     start, results)
+        return results
+
+    def _cached(self, register, length):
+        # Return the cached values of the registers, or None if they are not in
+        # a cache window.
+        for start, window in self._windows:
+            if start <= register and register + length <= start + window:
+                values = [self._cache.get(r) for r in range(register, register + length)]
+                if None in values:
+                    self.read_block(start, window)
+                    values = [self._cache[r] for r in range(register, register + length)]
+                return values
+        return None
+
+    def _invalidate(self, register, length):
+        # Written registers are read again from the device.
+        for r in range(register, register + length):
+            self._cache.pop(r, None)
 
     def writeRaw8(self, value):
         """Write an 8-bit value on the bus (without register)."""
@@ -113,6 +168,7 @@ class Device(object):
     def write8(self, register, value):
         """Write an 8-bit value to the specified register."""
         value = value & 0xFF
+        self._invalidate(register, 1)
         self._bus.write_byte_data(self._address, register, value)
         self._logger.debug("Wrote 0x%02X to register 0x%02X",
                      value, register)
@@ -120,12 +176,14 @@ class Device(object):
     def write16(self, register, value):
         """Write a 16-bit value to the specified register."""
         value = value & 0xFFFF
+        self._invalidate(register, 2)
         self._bus.write_word_data(self._address, register, value)
         self._logger.debug("Wrote 0x%04X to register pair 0x%02X, 0x%02X",
                      value, register, register+1)
 
     def writeList(self, register, data):
         """Write bytes to the specified register."""
+        self._invalidate(register, len(data))
         self._bus.write_i2c_block_data(self._address, register, data)
         self._logger.debug("Wrote to register 0x%02X: %s",
                      register, data)
@@ -133,6 +191,9 @@ class Device(object):
     def readList(self, register, length):
         """Read a length number of bytes from the specified register.  Results
         will be returned as a bytearray."""
+        cached = self._cached(register, length)
+        if cached is not None:
+            return bytearray(cached)
         results = self._bus.read_i2c_block_data(self._address, register, length)
         self._logger.debug("Read the following from register 0x%02X: %s",
                      register, results)
@@ -147,6 +208,9 @@ class Device(object):
 
     def readU8(self, register):
         """Read an unsigned byte from the specified register."""
+        cached = self._cached(register, 1)
+        if cached is not None:
+            return cached[0]
         result = self._bus.read_byte_data(self._address, register) & 0xFF
         self._logger.debug("Read 0x%02X from register 0x%02X",
                      result, register)
@@ -163,9 +227,14 @@ class Device(object):
         """Read an unsigned 16-bit value from the specified register, with the
         specified endianness (default little endian, or least significant byte
         first)."""
-        result = self._bus.read_word_data(self._address,register) & 0xFFFF
-        self._logger.debug("Read 0x%04X from register pair 0x%02X, 0x%02X",
-                           result, register, register+1)
+        cached = self._cached(register, 2)
+        if cached is not None:
+            # Same byte order as read_word_data.
+            result = (cached[1] << 8) | cached[0]
+        else:
+            result = self._bus.read_word_data(self._address,register) & 0xFFFF
+            self._logger.debug("Read 0x%04X from register pair 0x%02X, 0x%02X",
+                               result, register, register+1)
         # Swap bytes if using big endian because read_word_data assumes little
         # endian on ARM (little endian) systems.
         if not little_endian:
@@ -18,6 +18,7 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import contextlib
 import math
 
 import Adafruit_GPIO as GPIO
@@ -46,6 +47,16 @@ class MCP230xxBase(GPIO.BaseGPIO):
         self.iodir = [0xFF]*self.gpio_bytes  # Default direction to all inputs.
         self.gppu = [0x00]*self.gpio_bytes  # Default to pullups disabled.
         self.gpio = [0x00]*self.gpio_bytes
+        # Interrupt-on-change enable and control, see add_event_detect().
+        self.gpinten = [0x00]*self.gpio_bytes
+        self.intcon = [0x00]*self.gpio_bytes  # Compare against previous value.
+        self.intcap = [0x00]*self.gpio_bytes
+        self._edges = {}
+        self._callbacks = {}
+        self._events = set()
+        # Register writes are held back while a batch is active, see begin().
+        self._batch_depth = 0
+        self._batch_start = None
         # Write current direction and pullup buffer state.
         self.write_iodir()
         self.write_gppu()
@@ -99,10 +110,11 @@ class MCP230xxBase(GPIO.BaseGPIO):
         GPIO.HIGH/True if the pin is pulled high, or GPIO.LOW/False if pulled low.
         """
         [self._validate_pin(pin) for pin in pins]
-        # Get GPIO state.
-        self.gpio = self._device.readList(self.GPIO, self.gpio_bytes)
+        # Get GPIO state.  Keep the gpio buffer, it holds the output values
+        # (which may not be written yet inside a batch).
+        gpio = self._device.readList(self.GPIO, self.gpio_bytes)
         # Return True if pin's bit is set.
-        return [(self.gpio[int(pin/8)] & 1 << (int(pin%8))) > 0 for pin in pins]
+        return [(gpio[int(pin/8)] & 1 << (int(pin%8))) > 0 for pin in pins]
 
 
     def pullup(self, pin, enabled):
@@ -116,13 +128,164 @@ class MCP230xxBase(GPIO.BaseGPIO):
             self.gppu[int(pin/8)] &= ~(1 << (int(pin%8)))
         self.write_gppu()
 
+    def begin(self):
+        """Start a batch.  Until the matching commit() the setup, output and
+        pullup changes only update the gpio, iodir and gppu buffers, commit()
+        then writes each register that changed once.  Batches can be nested,
+        only the outermost commit() writes.
+        """
+        if not self._batch_depth:
+            self._batch_start = dict(self._registers())
+        self._batch_depth += 1
+
+    def commit(self):
+        """End a batch started with begin() and write the registers that
+        changed during it.
+        """
+        if not self._batch_depth:
+            raise RuntimeError('commit() called without begin().')
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return
+        start, self._batch_start = self._batch_start, None
+        # Set output levels and pullups before switching pins to output.
+        for register, values in self._registers():
+            if values != start[register]:
+                self._device.writeList(register, values)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager that wraps begin() and commit(), for example:
+
+            with mcp.batch():
+                for pin in range(8):
+                    mcp.output(pin, GPIO.HIGH)
+        """
+        self.begin()
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def _registers(self):
+        # Register addresses and buffered values, in the order they are written.
+        return [(self.GPPU, list(self.gppu)), (self.GPIO, list(self.gpio)),
+                (self.IODIR, list(self.iodir)), (self.INTCON, list(self.intcon)),
+                (self.GPINTEN, list(self.gpinten))]
+
+    def _write_register(self, register, values):
+        if not self._batch_depth:
+            self._device.writeList(register, values)
+
+    def attach_interrupt(self, gpio, pin):
+        """Handle pin change events from the chip's interrupt output.  Gpio is
+        the host GPIO adapter (for example GPIO.get_platform_gpio()) and pin
+        the host pin that is connected to the INT output (INTA on the
+        MCP23017, which then reports changes of both ports).  Events enabled
+        with add_event_detect() are then delivered from the host's edge
+        detection, without polling the I2C bus.
+        """
+        if self.IOCON_INT:
+            self._device.write8(self.IOCON, self.IOCON_INT)
+        # The INT output is active low, a change pulls it down until INTCAP
+        # is read.  Read it once so a pending interrupt does not block it.
+        gpio.setup(pin, GPIO.IN, GPIO.PUD_UP)
+        self._read_interrupt()
+        gpio.add_event_detect(pin, GPIO.FALLING, callback=self.handle_interrupt)
+
+    def _read_interrupt(self):
+        # INTF and INTCAP are adjacent, read both at once.  Reading INTCAP
+        # clears the interrupt.
+        data = self._device.readList(self.INTF, 2*self.gpio_bytes)
+        self.intcap = list(data[self.gpio_bytes:])
+        return data[:self.gpio_bytes]
+
+    def handle_interrupt(self, channel=None):
+        """Read which pins caused an interrupt and their captured values, and
+        dispatch the events.  Called by the host's edge detection once
+        attach_interrupt() was used, can also be called directly by
+        applications that watch the INT output themselves.  Callbacks are
+        called with the pin and its captured value.
+        """
+        intf = self._read_interrupt()
+        for pin, edge in list(self._edges.items()):
+            if not intf[int(pin/8)] & 1 << (int(pin%8)):
+                continue
+            value = (self.intcap[int(pin/8)] & 1 << (int(pin%8))) > 0
+            if edge == GPIO.RISING and not value or edge == GPIO.FALLING and value:
+                continue
+            self._events.add(pin)
+            callback = self._callbacks.get(pin)
+            if callback is not None:
+                callback(pin, value)
+
+    def add_event_detect(self, pin, edge, callback=None):
+        """Enable interrupt-on-change for the specified pin.  Edge must be
+        GPIO.RISING, GPIO.FALLING or GPIO.BOTH.  Callback is an optional
+        function called with the pin and its captured value.  Events are
+        received through attach_interrupt() or handle_interrupt().
+        """
+        self._validate_pin(pin)
+        if edge not in (GPIO.RISING, GPIO.FALLING, GPIO.BOTH):
+            raise ValueError('Unexpected edge.  Must be GPIO.RISING, GPIO.FALLING or GPIO.BOTH.')
+        self._edges[pin] = edge
+        if callback is not None:
+            self._callbacks[pin] = callback
+        self.intcon[int(pin/8)] &= ~(1 << (int(pin%8)))
+        self.gpinten[int(pin/8)] |= 1 << (int(pin%8))
+        self.write_intcon()
+        self.write_gpinten()
+
+    def remove_event_detect(self, pin):
+        """Disable interrupt-on-change for the specified pin."""
+        self._validate_pin(pin)
+        self._edges.pop(pin, None)
+        self._callbacks.pop(pin, None)
+        self._events.discard(pin)
+        self.gpinten[int(pin/8)] &= ~(1 << (int(pin%8)))
+        self.write_gpinten()
+
+    def add_event_callback(self, pin, callback):
+        """Add a callback for an event already defined using add_event_detect().
+        """
+        self._validate_pin(pin)
+        if pin not in self._edges:
+            raise RuntimeError('Add event detection using add_event_detect first.')
+        self._callbacks[pin] = callback
+
+    def event_detected(self, pin):
+        """Returns True if an edge has occured on the specified pin since the
+        last call.  Enable edge detection using add_event_detect() first.
+        """
+        self._validate_pin(pin)
+        if pin in self._events:
+            self._events.discard(pin)
+            return True
+        return False
+
+    def write_gpinten(self, gpinten=None):
+        """Write the specified byte value to the GPINTEN registor.  If no value
+        specified the current buffered value will be written.
+        """
+        if gpinten is not None:
+            self.gpinten = gpinten
+        self._write_register(self.GPINTEN, self.gpinten)
+
+    def write_intcon(self, intcon=None):
+        """Write the specified byte value to the INTCON registor.  If no value
+        specified the current buffered value will be written.
+        """
+        if intcon is not None:
+            self.intcon = intcon
+        self._write_register(self.INTCON, self.intcon)
+
     def write_gpio(self, gpio=None):
         """Write the specified byte value to the GPIO registor.  If no value
         specified the current buffered value will be written.
         """
         if gpio is not None:
             self.gpio = gpio
-        self._device.writeList(self.GPIO, self.gpio)
+        self._write_register(self.GPIO, self.gpio)
 
     def write_iodir(self, iodir=None):
         """Write the specified byte value to the IODIR registor.  If no value
@@ -130,7 +293,7 @@ class MCP230xxBase(GPIO.BaseGPIO):
         """
         if iodir is not None:
             self.iodir = iodir
-        self._device.writeList(self.IODIR, self.iodir)
+        self._write_register(self.IODIR, self.iodir)
 
     def write_gppu(self, gppu=None):
         """Write the specified byte value to the GPPU registor.  If no value
@@ -138,7 +301,7 @@ class MCP230xxBase(GPIO.BaseGPIO):
         """
         if gppu is not None:
             self.gppu = gppu
-        self._device.writeList(self.GPPU, self.gppu)
+        self._write_register(self.GPPU, self.gppu)
 
 
 class MCP23017(MCP230xxBase):
@@ -148,6 +311,13 @@ class MCP23017(MCP230xxBase):
     IODIR    = 0x00
     GPIO     = 0x12
     GPPU     = 0x0C
+    GPINTEN  = 0x04
+    INTCON   = 0x08
+    IOCON    = 0x0A
+    INTF     = 0x0E
+    INTCAP   = 0x10
+    # IOCON.MIRROR, INTA reports changes of both ports.
+    IOCON_INT = 0x40
 
     def __init__(self, address=0x20, **kwargs):
         super(MCP23017, self).__init__(address, **kwargs)
@@ -160,6 +330,12 @@ class MCP23008(MCP230xxBase):
     IODIR    = 0x00
     GPIO     = 0x09
     GPPU     = 0x06
+    GPINTEN  = 0x02
+    INTCON   = 0x04
+    IOCON    = 0x05
+    INTF     = 0x07
+    INTCAP   = 0x08
+    IOCON_INT = 0x00
 
     def __init__(self, address=0x20, **kwargs):
         super(MCP23008, self).__init__(address, **kwargs)
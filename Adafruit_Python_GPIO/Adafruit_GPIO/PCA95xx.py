@@ -56,14 +56,30 @@ class PCA9555(GPIO.BaseGPIO):
         busnum = busnum or i2c.get_default_bus()
         self._device = i2c.get_i2c_device(address, busnum, **kwargs)
         self.num_gpios = num_gpios
-        
+        # Shadow copies of the output, config and polarity registers, so pin
+        # changes need a single write and no read.
+        self.resync()
+
+    # Read the shadow registers back from the chip, e.g. after an external
+    # reset of the expander.
+    def resync(self):
+        self.iodir = self._readport(CONFIG_PORT)
+        self.outputvalue = self._readport(OUTPUT_PORT)
+        self.polarityvalue = self._readport(POLARITY_PORT)
+
+    def _readport(self, port):
         if self.num_gpios <= 8:
-            self.iodir = self._device.readU8(CONFIG_PORT)
-            self.outputvalue = self._device.readU8(OUTPUT_PORT)
-
+            return self._device.readU8(port)
         elif self.num_gpios > 8 and self.num_gpios <= 16:
-            self.iodir = self._device.readU16(CONFIG_PORT<< 1)
-            self.outputvalue = self._device.readU16(OUTPUT_PORT << 1)
+            return self._device.readU16(port << 1)
+
+    # Write all pins of a port, both 8 bit halves in one transfer on the 16
+    # GPIO chips.
+    def _writeport(self, port, portstate):
+        if self.num_gpios <= 8:
+            self._device.write8(port, portstate)
+        else:
+            self._device.write16(port << 1, portstate)
 
     def _changebit(self, bitmap, bit, value):
         assert value == 1 or value == 0, "Value is %s must be 1 or 0" % value
@@ -72,46 +88,47 @@ class PCA9555(GPIO.BaseGPIO):
         elif value == 1:
             return bitmap | (1 << bit)
 
-    # Change the value of bit PIN on port PORT to VALUE.  If the
-    # current pin state for the port is passed in as PORTSTATE, we
-    # will avoid doing a read to get it.  The port pin state must be
-    # complete if passed in (IE it should not just be the value of the
-    # single pin we are trying to change)
-    def _readandchangepin(self, port, pin, value, portstate = None):
-        assert pin >= 0 and pin < self.num_gpios, "Pin number %s is invalid, only 0-%s are valid" % (pin, self.num_gpios)
-        if not portstate:
-          if self.num_gpios <= 8:
-             portstate = self._device.readU8(port)
-          elif self.num_gpios > 8 and self.num_gpios <= 16:
-             portstate = self._device.readU16(port << 1)
-        newstate = self._changebit(portstate, pin, value)
-        if self.num_gpios <= 8:
-            self._device.write8(port, newstate)
-        else:
-            self._device.write16(port << 1, newstate)
+    # Change the bits of the pins in the PINS dict on port PORT to their
+    # values, starting from the port state PORTSTATE, and write the port
+    # once.  Returns the new port state.
+    def _changepins(self, port, pins, portstate):
+        newstate = portstate
+        for pin, value in iter(pins.items()):
+            assert pin >= 0 and pin < self.num_gpios, "Pin number %s is invalid, only 0-%s are valid" % (pin, self.num_gpios)
+            newstate = self._changebit(newstate, pin, int(value))
+        self._writeport(port, newstate)
         return newstate
 
     # Polarity inversion
     def polarity(self, pin, value):
-        return self._readandchangepin(POLARITY_PORT, pin, value)
+        self.polarityvalue = self._changepins(POLARITY_PORT, {pin: value}, self.polarityvalue)
+        return self.polarityvalue
 
     # Pin direction
     def config(self, pin, mode):
-        self.iodir = self._readandchangepin(CONFIG_PORT, pin, mode, self.iodir)
+        return self.setup_pins({pin: mode})
+
+    def setup_pins(self, pins):
+        self.iodir = self._changepins(CONFIG_PORT, pins, self.iodir)
         return self.iodir
 
     def output(self, pin, value):
-        assert self.iodir & (1 << pin) == 0, "Pin %s not set to output" % pin
-        self.outputvalue = self._readandchangepin(OUTPUT_PORT, pin, value, self.outputvalue)
+        return self.output_pins({pin: value})
+
+    def output_pins(self, pins):
+        for pin in pins:
+            assert self.iodir & (1 << pin) == 0, "Pin %s not set to output" % pin
+        self.outputvalue = self._changepins(OUTPUT_PORT, pins, self.outputvalue)
         return self.outputvalue
 
     def input(self, pin):
-        assert self.iodir & (1 << pin) != 0, "Pin %s not set to input" % pin
-        if self.num_gpios <= 8:
-            value = self._device.readU8(INPUT_PORT)
-        elif self.num_gpios > 8 and self.num_gpios <= 16:
-            value = self._device.readU16(INPUT_PORT << 1)
-        return value & (1 << pin)
+        return self.input_pins([pin])[0]
+
+    def input_pins(self, pins):
+        for pin in pins:
+            assert self.iodir & (1 << pin) != 0, "Pin %s not set to input" % pin
+        value = self._readport(INPUT_PORT)
+        return [value & (1 << pin) for pin in pins]
 
     def setup(self, pin, mode):
         self.config(pin, mode)
@@ -54,11 +54,22 @@ class PCF8574(GPIO.BaseGPIO):
         # Buffer register values so they can be changed without reading.
         self.iodir = 0xFF  # Default direction to all inputs is in
         self.gpio = 0x00
+        self._port = None  # Last byte written to the port.
         self._write_pins()
 
 
     def _write_pins(self):
-        self._device.writeRaw8(self.gpio | self.iodir)
+        # The port has no registers, a write sets the whole port.  Skip the
+        # bus transaction if it would not change anything.
+        port = self.gpio | self.iodir
+        if port != self._port:
+            self._device.writeRaw8(port)
+            self._port = port
+
+    # Forget the port state, so the next write goes out even if it does not
+    # change anything, e.g. after a power-on reset of the expander.
+    def resync(self):
+        self._port = None
 
     def _read_pins(self):
         return self._device.readRaw8() & self.iodir
@@ -19,6 +19,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import ctypes
+import itertools
 import operator
 import time
 
@@ -28,6 +30,37 @@ import Adafruit_GPIO as GPIO
 MSBFIRST = 0
 LSBFIRST = 1
 
+# The spidev kernel module limits the size of a single transfer to this many
+# bytes (4096 unless changed with the bufsiz module parameter).
+SPIDEV_BUFSIZ = '/sys/module/spidev/parameters/bufsiz'
+
+# The kernel rounds the size of every transfer in a message up to the kmalloc
+# alignment (at most 128 bytes) when checking the total against bufsiz.
+SPIDEV_ALIGN = 128
+# At most this many transfers fit into the size field of SPI_IOC_MESSAGE.
+SPIDEV_MAX_TRANSFERS = (1 << 14) // 32 - 1
+
+
+class SpiIocTransfer(ctypes.Structure):
+    """struct spi_ioc_transfer from linux/spi/spidev.h."""
+    _fields_ = [('tx_buf', ctypes.c_uint64),
+                ('rx_buf', ctypes.c_uint64),
+                ('len', ctypes.c_uint32),
+                ('speed_hz', ctypes.c_uint32),
+                ('delay_usecs', ctypes.c_uint16),
+                ('bits_per_word', ctypes.c_uint8),
+                ('cs_change', ctypes.c_uint8),
+                ('tx_nbits', ctypes.c_uint8),
+                ('rx_nbits', ctypes.c_uint8),
+                ('word_delay_usecs', ctypes.c_uint8),
+                ('pad', ctypes.c_uint8)]
+
+
+def spi_ioc_message(count):
+    """Return the SPI_IOC_MESSAGE(count) ioctl request number."""
+    # _IOW('k', 0, char[count * sizeof(struct spi_ioc_transfer)])
+    return (1 << 30) | ((count * ctypes.sizeof(SpiIocTransfer)) << 16) | (ord('k') << 8)
+
 
 class SpiDev(object):
     """Hardware-based SPI implementation using the spidev interface."""
@@ -44,6 +77,11 @@ class SpiDev(object):
         # Default to mode 0, and make sure CS is active low.
         self._device.mode = 0
         self._device.cshigh = False
+        try:
+            with open(SPIDEV_BUFSIZ, 'r') as bufsiz:
+                self._bufsiz = int(bufsiz.read())
+        except (IOError, OSError, ValueError):
+            self._bufsiz = 4096
 
     def set_clock_hz(self, hz):
         """Set the speed of the SPI clock in hertz.  Note that not all speeds
@@ -78,9 +116,73 @@ class SpiDev(object):
 
     def write(self, data):
         """Half-duplex SPI write.  The specified array of bytes will be clocked
-        out the MOSI line.
+        out the MOSI line.  Data can be a list of byte values or a bytes,
+        bytearray or memoryview object, which is sent without being copied
+        into a list first.
+        """
+        writebytes2 = getattr(self._device, 'writebytes2', None)
+        if writebytes2 is not None:
+            # Takes any buffer and sends up to bufsiz bytes per transfer.
+            writebytes2(data)
+            return
+        # Older spidev versions only take lists of at most bufsiz bytes.
+        for start in range(0, len(data), self._bufsiz):
+            self._device.writebytes(list(data[start:start + self._bufsiz]))
+
+    def write_segments(self, buffers):
+        """Half-duplex SPI write of several buffers as one stream.  Each buffer
+        becomes one spi_ioc_transfer, and as many of them as the kernel allows
+        (bufsiz bytes in total) are submitted with a single SPI_IOC_MESSAGE
+        ioctl, so there are no gaps between them and chip select stays
+        asserted.  Between ioctls chip select is asked to stay asserted as
+        well, which most controllers honor.  Buffers larger than bufsiz are
+        split.  Writable buffers (bytearray, memoryview) are sent without
+        copying them.
         """
-        self._device.writebytes(data)
+        import fcntl
+        # Split the buffers into (address, length) transfers and group them
+        # into messages.  The ctypes arrays in keep keep the memory alive.
+        keep = []
+        messages = [[]]
+        total = 0
+        # The kernel checks the sum of the transfer lengths rounded up to
+        # SPIDEV_ALIGN, so whole transfers must fit bufsiz after rounding.
+        chunk = max(self._bufsiz // SPIDEV_ALIGN * SPIDEV_ALIGN, SPIDEV_ALIGN)
+        for data in buffers:
+            data = self._transfer_buffer(data)
+            keep.append(data)
+            address = ctypes.addressof(data)
+            for start in range(0, len(data), chunk):
+                length = min(len(data) - start, chunk)
+                size = -(-length // SPIDEV_ALIGN) * SPIDEV_ALIGN
+                if messages[-1] and (total + size > self._bufsiz or
+                                     len(messages[-1]) == SPIDEV_MAX_TRANSFERS):
+                    messages.append([])
+                    total = 0
+                messages[-1].append((address + start, length))
+                total += size
+        fd = self._device.fileno()
+        for index, message in enumerate(messages):
+            if not message:
+                continue
+            transfers = (SpiIocTransfer * len(message))()
+            for transfer, (address, length) in zip(transfers, message):
+                transfer.tx_buf = address
+                transfer.len = length
+            # Keep chip select asserted after all but the last message.
+            transfers[-1].cs_change = int(index < len(messages) - 1)
+            fcntl.ioctl(fd, spi_ioc_message(len(message)), transfers)
+
+    @staticmethod
+    def _transfer_buffer(data):
+        """Return a ctypes char array that shares memory with data if it is
+        writable, or holds a copy of it otherwise.
+        """
+        try:
+            return (ctypes.c_char * len(data)).from_buffer(data)
+        except TypeError:
+            data = bytearray(data)
+            return (ctypes.c_char * len(data)).from_buffer(data)
 
     def read(self, length):
         """Half-duplex SPI read.  The specified length of bytes will be clocked
@@ -197,6 +299,8 @@ class BitBang(object):
             self._read_leading = True
         # Put clock into its base state.
         self._gpio.output(self._sclk, self._clock_base)
+        # The bit tables depend on the clock base, build them again.
+        self._write_table = None
 
     def set_bit_order(self, order):
         """Set order of bits to be read/written over serial lines.  Should be
@@ -216,6 +320,58 @@ class BitBang(object):
             self._read_shift = operator.lshift
         else:
             raise ValueError('Order must be MSBFIRST or LSBFIRST.')
+        # The bit tables depend on the bit order, build them again.
+        self._write_table = None
+
+    def _build_tables(self):
+        # For every byte value, precompute its 8 bits in the order they are
+        # sent, and the values written to MOSI, SCLK, SCLK for each of them.
+        # The read table maps 8 received bits (as bytes of 0 and 1) back to
+        # the byte value.
+        self._bit_table = []
+        self._write_table = []
+        self._read_table = {}
+        for byte in range(256):
+            bits = tuple(GPIO.HIGH if self._write_shift(byte, i) & self._mask else GPIO.LOW
+                         for i in range(8))
+            values = []
+            for bit in bits:
+                values.extend((bit, not self._clock_base, self._clock_base))
+            self._bit_table.append(bits)
+            self._write_table.append(tuple(values))
+            self._read_table[bytes(bytearray(bits))] = byte
+        self._write_pins = [self._mosi, self._sclk, self._sclk] * 8
+
+    def _clock_bits(self, bits, write):
+        # Clock out one bit for each entry of bits, writing it to MOSI first
+        # if write is true, and sample MISO on the leading or trailing edge.
+        # Returns the samples as a bytearray of 0 and 1.
+        transfer_bits = getattr(self._gpio, 'transfer_bits', None)
+        if transfer_bits is not None:
+            return bytearray(transfer_bits(bits, self._mosi if write else None, self._miso,
+                                           self._sclk, self._clock_base, self._read_leading))
+        output = self._gpio.output
+        is_high = self._gpio.is_high
+        mosi, miso, sclk = self._mosi, self._miso, self._sclk
+        clock_base = self._clock_base
+        clock_off = not clock_base
+        read_leading = self._read_leading
+        samples = bytearray(len(bits))
+        for i, bit in enumerate(bits):
+            if write:
+                output(mosi, bit)
+            output(sclk, clock_off)
+            if read_leading:
+                samples[i] = is_high(miso)
+            output(sclk, clock_base)
+            if not read_leading:
+                samples[i] = is_high(miso)
+        return samples
+
+    def _assemble_bytes(self, samples):
+        # Turn samples of 8 bits each back into bytes.
+        table = self._read_table
+        return bytearray(table[bytes(samples[i:i + 8])] for i in range(0, len(samples), 8))
 
     def close(self):
         """Close the SPI connection.  Unused in the bit bang implementation."""
@@ -231,17 +387,20 @@ class BitBang(object):
             raise RuntimeError('Write attempted with no MOSI pin specified.')
         if assert_ss and self._ss is not None:
             self._gpio.set_low(self._ss)
-        for byte in data:
-            for i in range(8):
-                # Write bit to MOSI.
-                if self._write_shift(byte, i) & self._mask:
-                    self._gpio.set_high(self._mosi)
-                else:
-                    self._gpio.set_low(self._mosi)
-                # Flip clock off base.
-                self._gpio.output(self._sclk, not self._clock_base)
-                # Return clock to base.
-                self._gpio.output(self._sclk, self._clock_base)
+        if self._write_table is None:
+            self._build_tables()
+        # For each bit: Write it to MOSI, flip clock off base and return clock
+        # to base.  The whole buffer goes to the GPIO in one batch, as bits if
+        # the GPIO can clock them out itself.
+        write_bits = getattr(self._gpio, 'write_bits', None)
+        if write_bits is not None:
+            table = self._bit_table
+            bits = list(itertools.chain.from_iterable(table[byte & 0xFF] for byte in data))
+            write_bits(bits, self._mosi, self._sclk, self._clock_base)
+        else:
+            table = self._write_table
+            values = list(itertools.chain.from_iterable(table[byte & 0xFF] for byte in data))
+            self._gpio.output_sequence(self._write_pins * (len(values) // 24), values)
         if deassert_ss and self._ss is not None:
             self._gpio.set_high(self._ss)
 
@@ -255,29 +414,9 @@ class BitBang(object):
             raise RuntimeError('Read attempted with no MISO pin specified.')
         if assert_ss and self._ss is not None:
             self._gpio.set_low(self._ss)
-        result = bytearray(length)
-        for i in range(length):
-            for j in range(8):
-                # Flip clock off base.
-                self._gpio.output(self._sclk, not self._clock_base)
-                # Handle read on leading edge of clock.
-                if self._read_leading:
-                    if self._gpio.is_high(self._miso):
-                        # Set bit to 1 at appropriate location.
-                        result[i] |= self._read_shift(self._mask, j)
-                    else:
-                        # Set bit to 0 at appropriate location.
-                        result[i] &= ~self._read_shift(self._mask, j)
-                # Return clock to base.
-                self._gpio.output(self._sclk, self._clock_base)
-                # Handle read on trailing edge of clock.
-                if not self._read_leading:
-                    if self._gpio.is_high(self._miso):
-                        # Set bit to 1 at appropriate location.
-                        result[i] |= self._read_shift(self._mask, j)
-                    else:
-                        # Set bit to 0 at appropriate location.
-                        result[i] &= ~self._read_shift(self._mask, j)
+        if self._write_table is None:
+            self._build_tables()
+        result = self._assemble_bytes(self._clock_bits(bytearray(8 * length), False))
         if deassert_ss and self._ss is not None:
             self._gpio.set_high(self._ss)
         return result
@@ -291,38 +430,15 @@ class BitBang(object):
         """
         if self._mosi is None:
             raise RuntimeError('Write attempted with no MOSI pin specified.')
-        if self._mosi is None:
+        if self._miso is None:
             raise RuntimeError('Read attempted with no MISO pin specified.')
         if assert_ss and self._ss is not None:
             self._gpio.set_low(self._ss)
-        result = bytearray(len(data))
-        for i in range(len(data)):
-            for j in range(8):
-                # Write bit to MOSI.
-                if self._write_shift(data[i], j) & self._mask:
-                    self._gpio.set_high(self._mosi)
-                else:
-                    self._gpio.set_low(self._mosi)
-                # Flip clock off base.
-                self._gpio.output(self._sclk, not self._clock_base)
-                # Handle read on leading edge of clock.
-                if self._read_leading:
-                    if self._gpio.is_high(self._miso):
-                        # Set bit to 1 at appropriate location.
-                        result[i] |= self._read_shift(self._mask, j)
-                    else:
-                        # Set bit to 0 at appropriate location.
-                        result[i] &= ~self._read_shift(self._mask, j)
-                # Return clock to base.
-                self._gpio.output(self._sclk, self._clock_base)
-                # Handle read on trailing edge of clock.
-                if not self._read_leading:
-                    if self._gpio.is_high(self._miso):
-                        # Set bit to 1 at appropriate location.
-                        result[i] |= self._read_shift(self._mask, j)
-                    else:
-                        # Set bit to 0 at appropriate location.
-                        result[i] &= ~self._read_shift(self._mask, j)
+        if self._write_table is None:
+            self._build_tables()
+        table = self._bit_table
+        bits = list(itertools.chain.from_iterable(table[byte & 0xFF] for byte in data))
+        result = self._assemble_bytes(self._clock_bits(bits, True))
         if deassert_ss and self._ss is not None:
             self._gpio.set_high(self._ss)
         return result
@@ -0,0 +1,78 @@
+# Copyright (c) 2014 Adafruit Industries
+# Author: Tony DiCola
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+# Time the Python side of a bit bang SPI write, so the speedup of the batched
+# write over the former per-bit loop is tracked.  Run from the tests folder:
+#   python benchmark_SPI.py
+
+import timeit
+
+import Adafruit_GPIO.SPI as SPI
+
+from MockGPIO import MockGPIO
+
+
+# Size of a frame for a 600 LED APA102 strip.
+FRAME_BYTES = 2600
+
+
+class NullGPIO(MockGPIO):
+    # MockGPIO that drops all output, so only the driver's own cost is timed.
+    def output(self, pin, bit):
+        pass
+
+    def output_sequence(self, pins, values):
+        pass
+
+
+class PerBitBitBang(SPI.BitBang):
+    # The former BitBang.write, one GPIO call per pin change.
+    def write(self, data, assert_ss=True, deassert_ss=True):
+        if assert_ss and self._ss is not None:
+            self._gpio.set_low(self._ss)
+        for byte in data:
+            for i in range(8):
+                if self._write_shift(byte, i) & self._mask:
+                    self._gpio.set_high(self._mosi)
+                else:
+                    self._gpio.set_low(self._mosi)
+                self._gpio.output(self._sclk, not self._clock_base)
+                self._gpio.output(self._sclk, self._clock_base)
+        if deassert_ss and self._ss is not None:
+            self._gpio.set_high(self._ss)
+
+
+def time_write(cls, gpio_cls=NullGPIO, size=FRAME_BYTES, number=10, repeat=5):
+    """Return the best time in seconds for one write of size bytes."""
+    device = cls(gpio_cls(), 1, 2, 3, 4)
+    data = bytearray(i & 0xFF for i in range(size))
+    device.write(data)  # Build the tables outside of the timing.
+    return min(timeit.repeat(lambda: device.write(data), number=number,
+                             repeat=repeat)) / number
+
+
+if __name__ == '__main__':
+    for gpio_cls in (NullGPIO, MockGPIO):
+        per_bit = time_write(PerBitBitBang, gpio_cls)
+        batched = time_write(SPI.BitBang, gpio_cls)
+        print('{0}: {1} byte write per bit {2:.2f} ms, batched {3:.2f} ms ({4:.1f}x)'
+              .format(gpio_cls.__name__, FRAME_BYTES, per_bit * 1000,
+                      batched * 1000, per_bit / batched))
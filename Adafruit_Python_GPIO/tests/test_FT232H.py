@@ -0,0 +1,253 @@
+# Copyright (c) 2014 Adafruit Industries
+# Author: Tony DiCola
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import unittest
+
+from mock import patch
+
+
+class MockFTDI(object):
+    # Stand-in for the libftdi1 python binding that records every USB write
+    # and answers reads from the responses buffer.  The bad command sent to
+    # sync the MPSSE is answered like the chip does.
+    def __init__(self):
+        self.writes = []
+        self.responses = bytearray()
+        self.reads = []
+        self.latency = None
+
+    def usb_open(self, ctx, vid, pid):
+        return 0
+
+    def usb_open_string(self, ctx, description):
+        return 0
+
+    def usb_reset(self, ctx):
+        return 0
+
+    def read_data_set_chunksize(self, ctx, size):
+        return 0
+
+    def write_data_set_chunksize(self, ctx, size):
+        return 0
+
+    def set_latency_timer(self, ctx, latency):
+        self.latency = latency
+        return 0
+
+    def usb_purge_buffers(self, ctx):
+        return 0
+
+    def set_bitmode(self, ctx, mask, mode):
+        return 0
+
+    def new(self):
+        return 1
+
+    def free(self, ctx):
+        pass
+
+    def get_error_string(self, ctx):
+        return 'error'
+
+    def write_data(self, ctx, data, length):
+        data = bytes(data)
+        self.writes.append(data)
+        if data == b'\xAB':
+            self.responses.extend(b'\xFA\xAB')
+        return length
+
+    def read_data(self, ctx, length):
+        # A list in reads gives the number of bytes returned by each call.
+        if self.reads:
+            length = min(length, self.reads.pop(0))
+        data = bytes(self.responses[:length])
+        del self.responses[:length]
+        return len(data), data
+
+
+def safe_import_ft232h():
+    # Mock the ftdi1 module so the FT232H module can be imported.
+    with patch.dict('sys.modules', {'ftdi1': MockFTDI()}):
+        import Adafruit_GPIO.FT232H as FT232H
+        return FT232H
+
+FT232H = safe_import_ft232h()
+
+
+class FT232HTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ftdi = MockFTDI()
+        patcher = patch.object(FT232H, 'ftdi', self.ftdi)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch('atexit.register'):
+            self.ft232h = FT232H.FT232H()
+        del self.ftdi.writes[:]
+
+
+class TestFT232H(FT232HTestCase):
+    def test_init_syncs_mpsse(self):
+        self.ftdi = MockFTDI()
+        with patch.object(FT232H, 'ftdi', self.ftdi), patch('atexit.register'):
+            FT232H.FT232H()
+        self.assertEqual(self.ftdi.writes[-2:], [b'\xAB', b'\x80\x00\x00\x82\x00\x00'])
+
+    def test_init_sets_latency(self):
+        self.ftdi = MockFTDI()
+        with patch.object(FT232H, 'ftdi', self.ftdi), patch('atexit.register'):
+            FT232H.FT232H(latency_ms=2)
+        self.assertEqual(self.ftdi.latency, 2)
+
+    def test_write_sends_right_away(self):
+        self.ft232h.setup(8, FT232H.GPIO.OUT)
+        self.ft232h.output(8, FT232H.GPIO.HIGH)
+        self.assertEqual(len(self.ftdi.writes), 2)
+
+    def test_batch_sends_once(self):
+        with self.ft232h.batch():
+            self.ft232h.setup(8, FT232H.GPIO.OUT)
+            with self.ft232h.batch():
+                self.ft232h.output(8, FT232H.GPIO.HIGH)
+            self.assertEqual(self.ftdi.writes, [])
+            self.ft232h.output(8, FT232H.GPIO.LOW)
+        self.assertEqual(self.ftdi.writes,
+                         [b'\x80\x00\x00\x82\x00\x01' + b'\x80\x00\x00\x82\x01\x01' +
+                          b'\x80\x00\x00\x82\x00\x01'])
+
+    def test_read_flushes_queue(self):
+        self.ftdi.responses.extend(b'\x34\x12')
+        with self.ft232h.batch():
+            self.assertEqual(self.ft232h.mpsse_read_gpio(), 0x1234)
+            self.assertEqual(self.ftdi.writes, [b'\x81\x83'])
+
+    def test_queued_reads_collected_together(self):
+        first = self.ft232h.queue_read(b'\x81', 1)
+        second = self.ft232h.queue_read(b'\x81\x83', 2)
+        self.assertEqual(self.ftdi.writes, [])
+        self.ftdi.responses.extend(b'\x01\x02\x03')
+        self.assertEqual(self.ft232h.collect_reads(), [b'\x01', b'\x02\x03'])
+        self.assertEqual(self.ftdi.writes, [b'\x81\x81\x83\x87'])
+        self.assertEqual(first.data, b'\x01')
+        self.assertEqual(second.data, b'\x02\x03')
+
+    def test_pending_reads_collected_before_next_read(self):
+        pending = self.ft232h.queue_read(b'\x81', 1)
+        self.ftdi.responses.extend(b'\x01\x34\x12')
+        self.assertEqual(self.ft232h.mpsse_read_gpio(), 0x1234)
+        self.assertEqual(pending.data, b'\x01')
+
+    def test_read_in_pieces_does_not_back_off(self):
+        # Each byte arrives after some empty reads.
+        empty = FT232H._READ_RETRIES + 1
+        self.ftdi.reads = ([0] * empty + [1]) * 4
+        self.ftdi.responses.extend(b'\x01\x02\x03\x04')
+        with patch('time.sleep') as sleep:
+            self.assertEqual(self.ft232h._poll_read(4), b'\x01\x02\x03\x04')
+        self.assertEqual(sleep.call_count, 4)
+        for args in sleep.call_args_list:
+            self.assertEqual(args, ((FT232H._READ_MIN_DELAY,),))
+
+    def test_read_timeout(self):
+        with patch('time.sleep'):
+            self.assertRaises(RuntimeError, self.ft232h._poll_read, 1, 0)
+
+
+class TestFT232HSPI(FT232HTestCase):
+    def setUp(self):
+        super(TestFT232HSPI, self).setUp()
+        self.spi = FT232H.SPI(self.ft232h, cs=8)
+        del self.ftdi.writes[:]
+
+    def test_write_is_one_usb_write(self):
+        self.spi.write(bytearray([1, 2, 3]))
+        self.assertEqual(self.ftdi.writes,
+                         [b'\x80\x00\x03\x82\x00\x01' + b'\x11\x02\x00\x01\x02\x03' +
+                          b'\x80\x00\x03\x82\x01\x01'])
+
+    def test_long_write_split_into_commands(self):
+        data = bytearray(range(256)) * 300
+        self.spi.write(data)
+        self.assertEqual(len(self.ftdi.writes), 1)
+        write = self.ftdi.writes[0]
+        # CS, 65536 byte command, 11264 byte command, CS.
+        self.assertEqual(write[6:9], b'\x11\xFF\xFF')
+        self.assertEqual(write[9:9 + 65536], bytes(data[:65536]))
+        rest = 9 + 65536
+        self.assertEqual(write[rest:rest + 3], b'\x11\xFF\x2B')
+        self.assertEqual(write[rest + 3:-6], bytes(data[65536:]))
+        self.assertEqual(len(write), 6 + 3 + 65536 + 3 + 11264 + 6)
+
+    def test_transfer(self):
+        self.ftdi.responses.extend(b'\xAA\xBB')
+        self.assertEqual(self.spi.transfer([1, 2]), bytearray(b'\xAA\xBB'))
+        self.assertEqual(len(self.ftdi.writes), 1)
+        self.assertIn(b'\x31\x01\x00\x01\x02\x87', self.ftdi.writes[0])
+
+
+class TestFT232HI2C(FT232HTestCase):
+    def setUp(self):
+        super(TestFT232HI2C, self).setUp()
+        self.light = FT232H.I2CDevice(self.ft232h, 0x40)
+        self.temp = FT232H.I2CDevice(self.ft232h, 0x48)
+        del self.ftdi.writes[:]
+
+    def single_read(self, device, register, response):
+        # Return the USB write of a readU8 on its own.
+        self.ftdi.responses.extend(response)
+        device.readU8(register)
+        return self.ftdi.writes.pop()
+
+    def test_transaction_matches_single_reads(self):
+        light = self.single_read(self.light, 0x05, b'\x00\x00\x00\x2A')
+        temp = self.single_read(self.temp, 0x01, b'\x00\x00\x00\x17')
+        transaction = FT232H.I2CTransaction(self.ft232h)
+        transaction.readU8(self.light, 0x05)
+        transaction.readS8(self.temp, 0x01)
+        self.ftdi.responses.extend(b'\x00\x00\x00\x2A\x00\x00\x00\xF0')
+        self.assertEqual(transaction.execute(), [0x2A, -16])
+        # One USB write: the idle state once, then both commands back to back.
+        idle = len(self.ft232h.mpsse_gpio())
+        self.assertEqual(self.ftdi.writes, [light[:-1] + temp[idle:]])
+
+    def test_transaction_values_and_writes(self):
+        transaction = FT232H.I2CTransaction(self.ft232h)
+        transaction.readU16(self.light, 0x0C)
+        transaction.write8(self.temp, 0x02, 0x60)
+        transaction.readList(self.temp, 0x00, 3)
+        self.ftdi.responses.extend(b'\x00\x00\x00\x34\x12' + b'\x00\x00\x00' +
+                                   b'\x00\x00\x00\x01\x02\x03')
+        self.assertEqual(transaction.execute(), [0x1234, bytearray(b'\x01\x02\x03')])
+        self.assertEqual(len(self.ftdi.writes), 1)
+        self.assertEqual(self.ftdi.responses, bytearray())
+        self.assertEqual(transaction.execute(), [])
+
+    def test_transaction_verifies_acks(self):
+        transaction = FT232H.I2CTransaction(self.ft232h)
+        transaction.write8(self.temp, 0x02, 0x60)
+        transaction.readU8(self.light, 0x00)
+        self.ftdi.responses.extend(b'\x00\x00\x00' + b'\x00\x00\x01\x2A')
+        self.assertRaises(RuntimeError, transaction.execute)
+
+    def test_empty_transaction_sends_nothing(self):
+        self.assertEqual(FT232H.I2CTransaction(self.ft232h).execute(), [])
+        self.assertEqual(self.ftdi.writes, [])
@@ -19,6 +19,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import os
+import tempfile
 import unittest
 
 from mock import Mock, patch
@@ -72,6 +74,12 @@ class TestRPiGPIOAdapter(unittest.TestCase):
         adapter.output(1, False)
         rpi_gpio.output.assert_called_with(1, False)
 
+    def test_output_sequence(self):
+        rpi_gpio = Mock()
+        adapter = GPIO.RPiGPIOAdapter(rpi_gpio)
+        adapter.output_sequence((1, 2, 1), (True, False, False))
+        rpi_gpio.output.assert_called_once_with([1, 2, 1], [True, False, False])
+
     def test_input(self):
         rpi_gpio = Mock()
         adapter = GPIO.RPiGPIOAdapter(rpi_gpio)
@@ -132,6 +140,88 @@ class TestRPiGPIOAdapter(unittest.TestCase):
         rpi_gpio.cleanup.assert_called_with(1)
 
 
+class RecordingMemAdapter(GPIO.RPiGPIOMemAdapter):
+    # Record every register write as an (offset, value) tuple.
+    def __init__(self, path):
+        super(RecordingMemAdapter, self).__init__(path)
+        self.written = []
+
+    def _write_register(self, offset, value):
+        self.written.append((offset, value))
+        super(RecordingMemAdapter, self)._write_register(offset, value)
+
+
+class TestRPiGPIOMemAdapter(unittest.TestCase):
+    def setUp(self):
+        # A plain file stands in for /dev/gpiomem.
+        handle, self.path = tempfile.mkstemp()
+        os.write(handle, bytes(bytearray(GPIO.RPiGPIOMemAdapter.BLOCK_SIZE)))
+        os.close(handle)
+        self.gpio = RecordingMemAdapter(self.path)
+
+    def tearDown(self):
+        self.gpio.cleanup()
+        os.remove(self.path)
+
+    def test_setup(self):
+        self.gpio._write_register(0x04, 0xFFFFFFFF)
+        self.gpio.setup(12, GPIO.IN)
+        self.assertEqual(self.gpio._read_register(0x04), 0xFFFFFE3F)
+        self.gpio.setup(12, GPIO.OUT, GPIO.PUD_UP)
+        self.assertEqual(self.gpio._read_register(0x04), 0xFFFFFE7F)
+        self.assertListEqual(self.gpio.written[-4:], [(0x94, 2), (0x98, 1 << 12),
+                                                      (0x94, 0), (0x98, 0)])
+
+    def test_output(self):
+        self.gpio.output(3, GPIO.HIGH)
+        self.gpio.output(3, GPIO.LOW)
+        self.gpio.output(40, True)
+        self.assertListEqual(self.gpio.written, [(0x1C, 1 << 3), (0x28, 1 << 3),
+                                                 (0x20, 1 << 8)])
+
+    def test_output_pins(self):
+        self.gpio.output_pins({1: True, 2: False, 3: True})
+        self.assertListEqual(sorted(self.gpio.written), [(0x1C, 0b1010), (0x28, 0b0100)])
+
+    def test_input(self):
+        self.gpio._write_register(0x34, 1 << 5)
+        self.gpio._write_register(0x38, 1 << 1)
+        self.assertTrue(self.gpio.input(5))
+        self.assertFalse(self.gpio.input(6))
+        self.assertListEqual(self.gpio.input_pins([5, 6, 33]), [True, False, True])
+
+    def test_bit_bang_write_uses_write_bits(self):
+        device = SPI.BitBang(self.gpio, 11, 10)
+        del self.gpio.written[:]
+        device.write([0x80, 0x01])
+        data_set, data_clear = (0x1C, 1 << 10), (0x28, 1 << 10)
+        clock_pulse = [(0x1C, 1 << 11), (0x28, 1 << 11)]
+        expected = [data_set] + clock_pulse + ([data_clear] + clock_pulse) * 14 + \
+                   [data_set] + clock_pulse
+        self.assertListEqual(self.gpio.written, expected)
+
+
+    def test_bit_bang_transfer_uses_transfer_bits(self):
+        device = SPI.BitBang(self.gpio, 11, 10, 9)
+        # MISO (pin 9) reads high.
+        self.gpio._write_register(0x34, 1 << 9)
+        del self.gpio.written[:]
+        result = device.transfer([0x80])
+        self.assertEqual(result, bytearray([0xFF]))
+        data_set, data_clear = (0x1C, 1 << 10), (0x28, 1 << 10)
+        clock_pulse = [(0x1C, 1 << 11), (0x28, 1 << 11)]
+        self.assertListEqual(self.gpio.written,
+                             [data_set] + clock_pulse + ([data_clear] + clock_pulse) * 7)
+
+    def test_bit_bang_read_uses_transfer_bits(self):
+        device = SPI.BitBang(self.gpio, 11, 10, 9)
+        del self.gpio.written[:]
+        result = device.read(2)
+        self.assertEqual(result, bytearray([0x00, 0x00]))
+        # Only the clock is written.
+        self.assertListEqual(self.gpio.written, [(0x1C, 1 << 11), (0x28, 1 << 11)] * 16)
+
+
 class TestAdafruitBBIOAdapter(unittest.TestCase):
     def test_setup(self):
         bbio_gpio = Mock()
@@ -22,7 +22,7 @@
 import logging
 import unittest
 
-from mock import Mock, patch
+from mock import Mock, call, patch
 
 import Adafruit_GPIO.Platform as Platform
 
@@ -67,8 +67,8 @@ class MockSMBus(object):
         low = self._read_register(address, register+1)
         return (high << 8) | low
 
-    def read_i2c_block_data(self, address, length):
-        return [self._read_register(address+i) for i in range(length)]
+    def read_i2c_block_data(self, address, register, length):
+        return [self._read_register(address, register+i) for i in range(length)]
 
 
 def create_device(address, busnum):
@@ -82,6 +82,15 @@ def create_device(address, busnum):
         import Adafruit_GPIO.I2C as I2C
         return (I2C.Device(address, busnum), smbus, mockbus)
 
+def create_cached_device(address, busnum):
+    # Create a device on a MockSMBus passed as i2c_interface, with block reads
+    # recorded so cache hits can be checked.
+    mockbus = MockSMBus()
+    mockbus.read_i2c_block_data = Mock(wraps=mockbus.read_i2c_block_data)
+    I2C = safe_import_i2c()
+    return (I2C.Device(address, busnum, i2c_interface=Mock(return_value=mockbus)),
+            mockbus)
+
 def safe_import_i2c():
     # Mock the smbus module and inject it into the global namespace so the
     # Adafruit_GPIO.I2C module can be imported.  The imported I2C module is
@@ -154,6 +163,46 @@ class TestI2CDevice(unittest.TestCase):
         self.assertEqual(value, -4863)
 
 
+class TestI2CDeviceCache(unittest.TestCase):
+
+    def test_reads_in_window_use_one_block_read(self):
+        device, mockbus = create_cached_device(0x1F, 1)
+        mockbus._read[0x1F] = { 0x10: [0xED], 0x11: [0x01], 0x12: [0xFE],
+                                0x13: [0x80] }
+        device.cache_registers(0x10, 4)
+        self.assertEqual(device.readU8(0x12), 0xFE)
+        self.assertEqual(device.readU16(0x10), 0x01ED)
+        self.assertEqual(device.readS8(0x13), -128)
+        self.assertEqual(device.readList(0x11, 2), bytearray([0x01, 0xFE]))
+        mockbus.read_i2c_block_data.assert_called_once_with(0x1F, 0x10, 4)
+
+    def test_invalidate_cache_reads_again(self):
+        device, mockbus = create_cached_device(0x1F, 1)
+        mockbus._read[0x1F] = { 0x00: [0x01, 0x02], 0x01: [0x03, 0x04] }
+        device.cache_registers(0x00, 2)
+        self.assertEqual(device.readU8(0x01), 0x03)
+        device.invalidate_cache()
+        self.assertEqual(device.readU8(0x01), 0x04)
+        self.assertEqual(device.readU8(0x00), 0x02)
+        self.assertEqual(mockbus.read_i2c_block_data.call_count, 2)
+
+    def test_write_invalidates_register(self):
+        device, mockbus = create_cached_device(0x1F, 1)
+        mockbus._read[0x1F] = { 0x00: [0x01, 0x05], 0x01: [0x02, 0x02] }
+        device.cache_registers(0x00, 2)
+        self.assertEqual(device.readU8(0x00), 0x01)
+        device.write8(0x00, 0x05)
+        self.assertEqual(device.readU8(0x00), 0x05)
+        self.assertEqual(mockbus._written, { 0x1F: { 0x00: [0x05] }})
+
+    def test_read_block_splits_at_32_bytes(self):
+        device, mockbus = create_cached_device(0x1F, 1)
+        mockbus._read[0x1F] = dict((r, [r]) for r in range(40))
+        self.assertEqual(device.read_block(0x00, 40), bytearray(range(40)))
+        self.assertEqual(mockbus.read_i2c_block_data.call_args_list,
+                         [call(0x1F, 0x00, 32), call(0x1F, 0x20, 8)])
+
+
 class TestGetDefaultBus(unittest.TestCase):
     @patch('Adafruit_GPIO.Platform.pi_revision', Mock(return_value=1))
     @patch('Adafruit_GPIO.Platform.platform_detect', Mock(return_value=Platform.RASPBERRY_PI))
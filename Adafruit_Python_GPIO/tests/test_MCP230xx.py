@@ -0,0 +1,170 @@
+# Copyright (c) 2014 Adafruit Industries
+# Author: Tony DiCola
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import unittest
+
+from mock import Mock, call
+
+import Adafruit_GPIO as GPIO
+import Adafruit_GPIO.MCP230xx as MCP230xx
+
+
+def create_mcp(cls=MCP230xx.MCP23017):
+    # Create an expander on a mock I2C device and forget the writes done by
+    # the constructor.
+    device = Mock()
+    i2c = Mock()
+    i2c.get_i2c_device.return_value = device
+    mcp = cls(i2c=i2c)
+    device.reset_mock()
+    return (mcp, device)
+
+
+class TestMCP230xxBatch(unittest.TestCase):
+    def test_batch_writes_each_changed_register_once(self):
+        mcp, device = create_mcp()
+        device.readList.return_value = bytearray([0x02, 0x00])
+        mcp.begin()
+        mcp.setup(0, GPIO.OUT)
+        mcp.setup(8, GPIO.OUT)
+        mcp.output(0, GPIO.HIGH)
+        mcp.output(8, GPIO.HIGH)
+        mcp.pullup(1, True)
+        self.assertEqual(mcp.input(1), True)
+        mcp.output(0, GPIO.HIGH)
+        self.assertEqual(device.writeList.call_count, 0)
+        mcp.commit()
+        self.assertEqual(device.writeList.call_args_list,
+                         [call(MCP230xx.MCP23017.GPPU, [0x02, 0x00]),
+                          call(MCP230xx.MCP23017.GPIO, [0x01, 0x01]),
+                          call(MCP230xx.MCP23017.IODIR, [0xFE, 0xFE])])
+
+    def test_input_keeps_buffered_outputs(self):
+        mcp, device = create_mcp()
+        device.readList.return_value = bytearray([0x00, 0x00])
+        with mcp.batch():
+            mcp.setup(0, GPIO.OUT)
+            mcp.output(0, GPIO.HIGH)
+            mcp.input(1)
+        self.assertEqual(device.writeList.call_args_list,
+                         [call(MCP230xx.MCP23017.GPIO, [0x01, 0x00]),
+                          call(MCP230xx.MCP23017.IODIR, [0xFE, 0xFF])])
+
+    def test_nested_batch_writes_at_outermost_commit(self):
+        mcp, device = create_mcp()
+        with mcp.batch():
+            with mcp.batch():
+                mcp.output(3, GPIO.HIGH)
+            self.assertEqual(device.writeList.call_count, 0)
+        device.writeList.assert_called_once_with(MCP230xx.MCP23017.GPIO, [0x08, 0x00])
+
+    def test_unchanged_batch_writes_nothing(self):
+        mcp, device = create_mcp()
+        with mcp.batch():
+            mcp.output(3, GPIO.HIGH)
+            mcp.output(3, GPIO.LOW)
+        self.assertEqual(device.writeList.call_count, 0)
+
+    def test_commit_without_begin_fails(self):
+        mcp, device = create_mcp()
+        self.assertRaises(RuntimeError, mcp.commit)
+
+
+class TestMCP230xxInterrupts(unittest.TestCase):
+    def setUp(self):
+        self.mcp, self.device = create_mcp()
+        self.events = []
+        self.callback = lambda pin, value: self.events.append((pin, value))
+
+    def interrupt(self, intf, intcap):
+        # Let the chip report INTF and INTCAP (read together) and dispatch.
+        self.device.readList.return_value = bytearray(intf + intcap)
+        self.mcp.handle_interrupt()
+
+    def test_add_event_detect_enables_interrupt(self):
+        self.mcp.add_event_detect(3, GPIO.BOTH)
+        self.mcp.add_event_detect(9, GPIO.RISING)
+        self.assertEqual(self.device.writeList.call_args_list[-1],
+                         call(MCP230xx.MCP23017.GPINTEN, [0x08, 0x02]))
+        self.mcp.remove_event_detect(3)
+        self.assertEqual(self.device.writeList.call_args_list[-1],
+                         call(MCP230xx.MCP23017.GPINTEN, [0x00, 0x02]))
+        # Interrupts compare against the previous pin value.
+        self.assertListEqual(self.mcp.intcon, [0x00, 0x00])
+
+    def test_both_edges(self):
+        self.mcp.add_event_detect(3, GPIO.BOTH, callback=self.callback)
+        self.interrupt([0x08, 0x00], [0x08, 0x00])
+        self.interrupt([0x08, 0x00], [0x00, 0x00])
+        self.assertListEqual(self.events, [(3, True), (3, False)])
+        self.device.readList.assert_called_with(MCP230xx.MCP23017.INTF, 4)
+
+    def test_rising_edge(self):
+        self.mcp.add_event_detect(9, GPIO.RISING, callback=self.callback)
+        self.interrupt([0x00, 0x02], [0x00, 0x00])
+        self.interrupt([0x00, 0x02], [0x00, 0x02])
+        self.assertListEqual(self.events, [(9, True)])
+
+    def test_falling_edge(self):
+        self.mcp.add_event_detect(0, GPIO.FALLING, callback=self.callback)
+        self.interrupt([0x01, 0x00], [0x01, 0x00])
+        self.interrupt([0x01, 0x00], [0x00, 0xFF])
+        self.assertListEqual(self.events, [(0, False)])
+
+    def test_only_flagged_pins_fire(self):
+        self.mcp.add_event_detect(1, GPIO.BOTH, callback=self.callback)
+        self.mcp.add_event_detect(2, GPIO.BOTH, callback=self.callback)
+        self.interrupt([0x04, 0x00], [0x06, 0x00])
+        self.assertListEqual(self.events, [(2, True)])
+
+    def test_event_detected(self):
+        self.mcp.add_event_detect(5, GPIO.BOTH)
+        self.assertFalse(self.mcp.event_detected(5))
+        self.interrupt([0x20, 0x00], [0x20, 0x00])
+        self.assertTrue(self.mcp.event_detected(5))
+        self.assertFalse(self.mcp.event_detected(5))
+
+    def test_add_event_callback(self):
+        self.assertRaises(RuntimeError, self.mcp.add_event_callback, 5, self.callback)
+        self.mcp.add_event_detect(5, GPIO.FALLING)
+        self.mcp.add_event_callback(5, self.callback)
+        self.interrupt([0x20, 0x00], [0x00, 0x00])
+        self.assertListEqual(self.events, [(5, False)])
+
+    def test_attach_interrupt(self):
+        host = Mock()
+        self.device.readList.return_value = bytearray(4)
+        self.mcp.attach_interrupt(host, 17)
+        self.device.write8.assert_called_once_with(MCP230xx.MCP23017.IOCON, 0x40)
+        host.setup.assert_called_once_with(17, GPIO.IN, GPIO.PUD_UP)
+        host.add_event_detect.assert_called_once_with(17, GPIO.FALLING,
+                                                      callback=self.mcp.handle_interrupt)
+        # A pending interrupt is cleared before edges are detected.
+        self.device.readList.assert_called_once_with(MCP230xx.MCP23017.INTF, 4)
+
+    def test_mcp23008_registers(self):
+        mcp, device = create_mcp(MCP230xx.MCP23008)
+        device.readList.return_value = bytearray([0x80, 0x80])
+        mcp.add_event_detect(7, GPIO.BOTH, callback=self.callback)
+        device.writeList.assert_called_with(MCP230xx.MCP23008.GPINTEN, [0x80])
+        mcp.handle_interrupt()
+        device.readList.assert_called_with(MCP230xx.MCP23008.INTF, 2)
+        self.assertListEqual(self.events, [(7, True)])
@@ -0,0 +1,113 @@
+# Copyright (c) 2014 Adafruit Industries
+# Author: Tony DiCola
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import unittest
+
+from mock import Mock, call
+
+import Adafruit_GPIO as GPIO
+import Adafruit_GPIO.PCA95xx as PCA95xx
+
+
+def create_pca(num_gpios=16, config=0xFFFF, output=0x0000, polarity=0x0000):
+    # Create an expander on a mock I2C device that reports the given config,
+    # output and polarity registers, and forget the constructor's reads.
+    device = Mock()
+    registers = {PCA95xx.CONFIG_PORT: config, PCA95xx.OUTPUT_PORT: output,
+                 PCA95xx.POLARITY_PORT: polarity, PCA95xx.INPUT_PORT: 0}
+    device.readU16.side_effect = lambda register: registers[register >> 1]
+    device.readU8.side_effect = lambda register: registers[register]
+    i2c = Mock()
+    i2c.get_i2c_device.return_value = device
+    pca = PCA95xx.PCA9555(i2c=i2c, num_gpios=num_gpios)
+    device.reset_mock()
+    return (pca, device, registers)
+
+
+class TestPCA9555(unittest.TestCase):
+    def test_init_reads_shadow_registers(self):
+        pca, device, registers = create_pca(config=0xFF0F, output=0x00A0, polarity=0x0001)
+        self.assertEqual((pca.iodir, pca.outputvalue, pca.polarityvalue),
+                         (0xFF0F, 0x00A0, 0x0001))
+
+    def test_pin_change_is_one_write_and_no_read(self):
+        pca, device, registers = create_pca(config=0xFFFE)
+        pca.output(0, GPIO.HIGH)
+        device.write16.assert_called_once_with(PCA95xx.OUTPUT_PORT << 1, 0x0001)
+        self.assertEqual(device.readU16.call_count, 0)
+        self.assertEqual(device.readU8.call_count, 0)
+
+    def test_setup_pins_is_one_16bit_write(self):
+        pca, device, registers = create_pca()
+        pca.setup_pins({0: GPIO.OUT, 9: GPIO.OUT, 15: GPIO.OUT})
+        device.write16.assert_called_once_with(PCA95xx.CONFIG_PORT << 1, 0x7DFE)
+        self.assertEqual(pca.iodir, 0x7DFE)
+        self.assertEqual(device.readU16.call_count, 0)
+
+    def test_output_pins_is_one_16bit_write(self):
+        pca, device, registers = create_pca(config=0x0000, output=0x8000)
+        pca.output_pins({0: GPIO.HIGH, 8: GPIO.HIGH, 15: GPIO.LOW})
+        pca.output(1, GPIO.HIGH)
+        self.assertEqual(device.write16.call_args_list,
+                         [call(PCA95xx.OUTPUT_PORT << 1, 0x0101),
+                          call(PCA95xx.OUTPUT_PORT << 1, 0x0103)])
+        self.assertEqual(device.readU16.call_count, 0)
+
+    def test_output_to_input_pin_fails(self):
+        pca, device, registers = create_pca()
+        self.assertRaises(AssertionError, pca.output_pins, {3: GPIO.HIGH})
+        self.assertEqual(device.write16.call_count, 0)
+
+    def test_config_and_polarity_use_shadow(self):
+        pca, device, registers = create_pca(polarity=0x0000)
+        self.assertEqual(pca.config(2, GPIO.OUT), 0xFFFB)
+        self.assertEqual(pca.polarity(4, 1), 0x0010)
+        self.assertEqual(device.write16.call_args_list,
+                         [call(PCA95xx.CONFIG_PORT << 1, 0xFFFB),
+                          call(PCA95xx.POLARITY_PORT << 1, 0x0010)])
+        self.assertEqual(device.readU16.call_count, 0)
+
+    def test_input_pins_is_one_read(self):
+        pca, device, registers = create_pca()
+        registers[PCA95xx.INPUT_PORT] = 0x0201
+        self.assertEqual([bool(value) for value in pca.input_pins([0, 1, 9])],
+                         [True, False, True])
+        device.readU16.assert_called_once_with(PCA95xx.INPUT_PORT << 1)
+
+    def test_resync_reads_all_shadow_registers(self):
+        pca, device, registers = create_pca()
+        registers.update({PCA95xx.CONFIG_PORT: 0x00FF, PCA95xx.OUTPUT_PORT: 0x1200,
+                          PCA95xx.POLARITY_PORT: 0x0003})
+        pca.resync()
+        self.assertEqual(device.readU16.call_args_list,
+                         [call(PCA95xx.CONFIG_PORT << 1), call(PCA95xx.OUTPUT_PORT << 1),
+                          call(PCA95xx.POLARITY_PORT << 1)])
+        self.assertEqual((pca.iodir, pca.outputvalue, pca.polarityvalue),
+                         (0x00FF, 0x1200, 0x0003))
+
+    def test_8_gpio_chip_uses_8bit_writes(self):
+        pca, device, registers = create_pca(num_gpios=8, config=0xFF, output=0x00)
+        pca.setup(2, GPIO.OUT)
+        pca.output(2, GPIO.HIGH)
+        self.assertEqual(device.write8.call_args_list,
+                         [call(PCA95xx.CONFIG_PORT, 0xFB), call(PCA95xx.OUTPUT_PORT, 0x04)])
+        self.assertEqual(device.readU8.call_count, 0)
@@ -0,0 +1,69 @@
+# Copyright (c) 2014 Adafruit Industries
+# Author: Tony DiCola
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import unittest
+
+from mock import Mock, call
+
+import Adafruit_GPIO as GPIO
+import Adafruit_GPIO.PCF8574 as PCF8574
+
+
+def create_pcf():
+    # Create an expander on a mock I2C device.
+    device = Mock()
+    i2c = Mock()
+    i2c.get_i2c_device.return_value = device
+    return (PCF8574.PCF8574(i2c=i2c), device)
+
+
+class TestPCF8574(unittest.TestCase):
+    def test_output_pins_write_port_once(self):
+        pcf, device = create_pcf()
+        pcf.setup_pins(dict((pin, GPIO.OUT) for pin in range(8)))
+        pcf.output_pins(dict((pin, pin % 2) for pin in range(8)))
+        self.assertEqual(device.writeRaw8.call_args_list,
+                         [call(0xFF), call(0x00), call(0xAA)])
+
+    def test_identical_write_is_skipped(self):
+        pcf, device = create_pcf()
+        pcf.setup(0, GPIO.OUT)
+        pcf.output(0, GPIO.HIGH)
+        device.reset_mock()
+        pcf.output(0, GPIO.HIGH)
+        pcf.output_pins({0: GPIO.HIGH})
+        self.assertEqual(device.writeRaw8.call_count, 0)
+
+    def test_write_after_resync_goes_out(self):
+        pcf, device = create_pcf()
+        pcf.setup(0, GPIO.OUT)
+        pcf.output(0, GPIO.LOW)
+        device.reset_mock()
+        pcf.resync()
+        pcf.output(0, GPIO.LOW)
+        device.writeRaw8.assert_called_once_with(0xFE)
+
+    def test_input_pins_read_port_once(self):
+        pcf, device = create_pcf()
+        device.readRaw8.return_value = 0x05
+        self.assertEqual(pcf.input_pins([0, 1, 2]), [True, False, True])
+        self.assertEqual(device.readRaw8.call_count, 1)
@@ -19,14 +19,31 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import ctypes
+import os
+import struct
+import tempfile
 import unittest
 
+from mock import Mock, call, patch
+
 import Adafruit_GPIO as GPIO
 import Adafruit_GPIO.SPI as SPI
 
 from MockGPIO import MockGPIO
 
 
+class CountingGPIO(MockGPIO):
+    # Count the batched writes, which are still recorded pin by pin.
+    def __init__(self):
+        super(CountingGPIO, self).__init__()
+        self.sequences = 0
+
+    def output_sequence(self, pins, values):
+        self.sequences += 1
+        super(CountingGPIO, self).output_sequence(pins, values)
+
+
 class TestBitBangSPI(unittest.TestCase):
     def test_pin_modes_set_correctly(self):
         gpio = MockGPIO()
@@ -187,6 +204,159 @@ class TestBitBangSPI(unittest.TestCase):
         # Verify result
         self.assertEqual(result, bytearray([0x1F, 0xF8, 0x1F]))
 
+    def test_write_is_one_batch(self):
+        gpio = CountingGPIO()
+        device = SPI.BitBang(gpio, 1, 2, 3, 4)
+        device.write(bytearray(range(256)) * 4)
+        # One batch for the data, no output calls per bit.
+        self.assertEqual(gpio.sequences, 1)
+        self.assertEqual(len(gpio.pin_written[1]), 1 + 2 * 8 * 1024)
+        self.assertListEqual(gpio.pin_written[4], [1, 0, 1])
+
+    def test_mode_2_write_lsbfirst(self):
+        gpio = MockGPIO()
+        device = SPI.BitBang(gpio, 1, 2, 3, 4)
+        device.set_mode(2)
+        device.set_bit_order(SPI.LSBFIRST)
+        device.write([0x1F])
+        # Verify clock
+        self.assertListEqual(gpio.pin_written[1], [0, 1, 0, 1, 0, 1, 0, 1, 0,
+                                                   1, 0, 1, 0, 1, 0, 1, 0, 1])
+        # Verify MOSI
+        self.assertListEqual(gpio.pin_written[2], [1, 1, 1, 1, 1, 0, 0, 0])
+
+    def test_transfer_without_miso_fails(self):
+        gpio = MockGPIO()
+        device = SPI.BitBang(gpio, 1, 2, None, 4)
+        self.assertRaises(RuntimeError, device.transfer, [0x1F])
+
+    def test_mode_1_read_lsbfirst(self):
+        gpio = MockGPIO()
+        device = SPI.BitBang(gpio, 1, 2, 3, 4)
+        device.set_mode(1)
+        device.set_bit_order(SPI.LSBFIRST)
+        gpio.pin_read[3] = [0, 0, 0, 1, 1, 1, 1, 1]
+        result = device.read(1)
+        # Verify clock
+        self.assertListEqual(gpio.pin_written[1], [0, 0, 1, 0, 1, 0, 1, 0, 1,
+                                                   0, 1, 0, 1, 0, 1, 0, 1, 0])
+        # Verify result
+        self.assertEqual(result, bytearray([0xF8]))
+
     #TODO: Test mode 1, 2, 3
 
     #TODO: Test null MOSI, MISO, SS
+
+
+def create_spidev(device):
+    # Create a SpiDev whose spidev module returns the given mock device.
+    spidev = Mock()
+    spidev.SpiDev.return_value = device
+    with patch.dict('sys.modules', {'spidev': spidev}):
+        return SPI.SpiDev(0, 0)
+
+
+class TestSpiDev(unittest.TestCase):
+    def test_write_buffer_in_one_call_with_writebytes2(self):
+        device = Mock()
+        spi = create_spidev(device)
+        frame = memoryview(bytearray(range(256)) * 40)
+        spi.write(frame)
+        device.writebytes2.assert_called_once_with(frame)
+        self.assertFalse(device.writebytes.called)
+
+    @patch('Adafruit_GPIO.SPI.SPIDEV_BUFSIZ', '/nonexistent/bufsiz')
+    def test_write_without_writebytes2_uses_default_bufsiz(self):
+        device = Mock(spec=['open', 'close', 'writebytes'])
+        spi = create_spidev(device)
+        spi.write(bytearray(5000))
+        self.assertEqual(device.writebytes.call_args_list,
+                         [call([0] * 4096), call([0] * 904)])
+
+    def test_write_without_writebytes2_uses_kernel_bufsiz(self):
+        handle, path = tempfile.mkstemp()
+        os.write(handle, b'3\n')
+        os.close(handle)
+        try:
+            with patch('Adafruit_GPIO.SPI.SPIDEV_BUFSIZ', path):
+                device = Mock(spec=['open', 'close', 'writebytes'])
+                spi = create_spidev(device)
+        finally:
+            os.remove(path)
+        spi.write(b'\x01\x02\x03\x04')
+        self.assertEqual(device.writebytes.call_args_list,
+                         [call([1, 2, 3]), call([4])])
+
+
+class RecordingIoctl(object):
+    # Record the request number and the decoded spi_ioc_transfer structs of
+    # every ioctl, including the bytes each transfer points to.
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, fd, request, transfers):
+        raw = bytes(bytearray(transfers))
+        records = []
+        for offset in range(0, len(raw), 32):
+            fields = struct.unpack('<QQIIHBBBBBB', raw[offset:offset + 32])
+            tx_buf, rx_buf, length = fields[:3]
+            records.append((ctypes.string_at(tx_buf, length), rx_buf) + fields[3:])
+        self.calls.append((fd, request, records))
+        return 0
+
+
+class TestSpiDevWriteSegments(unittest.TestCase):
+    def setUp(self):
+        self.device = Mock()
+        self.device.fileno.return_value = 7
+        self.spi = create_spidev(self.device)
+        self.spi._bufsiz = 4096
+        self.ioctl = RecordingIoctl()
+
+    def test_spi_ioc_message_request_number(self):
+        self.assertEqual(ctypes.sizeof(SPI.SpiIocTransfer), 32)
+        self.assertEqual(SPI.spi_ioc_message(1), 0x40206b00)
+        self.assertEqual(SPI.spi_ioc_message(3), 0x40606b00)
+
+    def test_segments_sent_in_one_ioctl(self):
+        with patch('fcntl.ioctl', self.ioctl):
+            self.spi.write_segments([bytearray([1, 2, 3]), b'\x04\x05', [6]])
+        self.assertEqual(len(self.ioctl.calls), 1)
+        fd, request, records = self.ioctl.calls[0]
+        self.assertEqual(fd, 7)
+        self.assertEqual(request, SPI.spi_ioc_message(3))
+        # tx data, rx_buf, speed_hz, delay_usecs, bits_per_word, cs_change,
+        # tx_nbits, rx_nbits, word_delay_usecs, pad
+        self.assertListEqual(records, [(b'\x01\x02\x03', 0, 0, 0, 0, 0, 0, 0, 0, 0),
+                                       (b'\x04\x05', 0, 0, 0, 0, 0, 0, 0, 0, 0),
+                                       (b'\x06', 0, 0, 0, 0, 0, 0, 0, 0, 0)])
+
+    def test_segments_split_at_bufsiz(self):
+        self.spi._bufsiz = 256
+        data = bytearray(range(256)) * 2
+        with patch('fcntl.ioctl', self.ioctl):
+            self.spi.write_segments([data[:100], data[100:228], data[228:]])
+        # 100 bytes take up 128 bytes of bufsiz, so the next 128 still fit
+        # into the first message. The last 284 bytes are split at bufsiz.
+        self.assertEqual([len(records) for _, _, records in self.ioctl.calls], [2, 1, 1])
+        sent = b''.join(record[0] for _, _, records in self.ioctl.calls
+                        for record in records)
+        self.assertEqual(sent, bytes(data))
+        # Chip select stays asserted between messages, but not after the last.
+        self.assertListEqual([records[-1][5] for _, _, records in self.ioctl.calls],
+                             [1, 1, 0])
+
+    def test_segments_fit_unaligned_bufsiz(self):
+        self.spi._bufsiz = 4000
+        data = bytearray(range(256)) * 40
+        with patch('fcntl.ioctl', self.ioctl):
+            self.spi.write_segments([data])
+        # Every message, with its transfers rounded up to the alignment, has to
+        # fit into bufsiz.
+        for _, _, records in self.ioctl.calls:
+            aligned = sum(-(-len(record[0]) // SPI.SPIDEV_ALIGN) * SPI.SPIDEV_ALIGN
+                          for record in records)
+            self.assertLessEqual(aligned, 4000)
+        sent = b''.join(record[0] for _, _, records in self.ioctl.calls
+                        for record in records)
+        self.assertEqual(sent, bytes(data))